@@ -0,0 +1,36 @@
+"""
+Loads the agent.py of any agent folder from outside that folder, the way its main.py would. Used by
+the serving and benchmark scripts, which run from the repository root.
+"""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# every agent folder has its own "agent" module and most have a "tools" package,
+# so these names must be dropped from sys.modules before loading the next folder
+_FOLDER_LOCAL_MODULES = ("agent", "tools")
+
+
+def load_agent_module(agent_dir: str):
+    """Load <agent_dir>/agent.py the same way its main.py would, under a unique module name."""
+    path = os.path.join(REPO_ROOT, agent_dir)
+
+    for name in list(sys.modules):
+        if name in _FOLDER_LOCAL_MODULES or name.split(".")[0] in _FOLDER_LOCAL_MODULES:
+            del sys.modules[name]
+
+    module_name = "loaded_" + agent_dir.replace("/", "_").replace(".", "_")
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(path, "agent.py"))
+    module = importlib.util.module_from_spec(spec)
+    # registered before executing so pydantic models can resolve their own module
+    sys.modules[module_name] = module
+
+    sys.path.insert(0, path)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(path)
+
+    return module
@@ -0,0 +1,125 @@
+"""
+Helpers shared by the manual tool-calling agents of this folder (simple_math_problems_agent and
+youtube_agent). Each agent.py puts this folder on sys.path before importing it, so the agents
+still run from their own folder with python main.py.
+"""
+import ast
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+COMPACTION_STRATEGIES = ("truncate", "elide", "summary")
+# per-invoke metrics (round trips, prompt sizes) kept by a long-running agent, the oldest are dropped
+METRICS_WINDOW = 1000
+
+
+def run_tool_calls(tool_map: Dict[str, BaseTool], tool_calls: List[dict], timeout: float, max_workers: int = 8) -> List[ToolMessage]:
+    """
+    Run every tool call of a turn concurrently, at most max_workers at a time, and return their
+    ToolMessages in call order.
+
+    The whole turn has one deadline of timeout seconds, however many tools are slow. A tool that
+    is still running then, an unknown tool name or a tool that raised gets an "Error: ..." result,
+    so every tool call is answered and the LLM can react to the failure.
+    """
+    results = {}
+    calls = {}
+    for i, tool_call in enumerate(tool_calls):
+        tool = tool_map.get(tool_call["name"])
+        if tool is None:
+            results[i] = f"Error: unknown tool {tool_call['name']}, the available tools are {', '.join(tool_map)}"
+            continue
+        calls[i] = (tool, tool_call["args"])
+
+    # a pool per turn: a thread still running after the deadline cannot be stopped, on a pool shared
+    # by every turn a few hung calls (a stuck download) would keep its workers and time out later turns
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))), thread_name_prefix="tool-call")
+    try:
+        futures = {i: executor.submit(tool.invoke, args) for i, (tool, args) in calls.items()}
+        _, not_done = wait(futures.values(), timeout=timeout)
+        for i, future in futures.items():
+            if future in not_done:
+                results[i] = f"Error: {tool_calls[i]['name']} timed out after {timeout}s"
+                continue
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = f"Error: {str(e)}"
+    finally:
+        # returns at once, calls still queued are dropped and hung ones are left to finish on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return [
+        ToolMessage(content=str(results[i]), name=tool_call["name"], tool_call_id=tool_call["id"])
+        for i, tool_call in enumerate(tool_calls)
+    ]
+
+
+def history_chars(chat_history: List[BaseMessage]) -> int:
+    """Characters re-sent to the LLM for chat_history, tool call arguments included."""
+    return sum(len(str(m.content)) + len(str(getattr(m, "tool_calls", "") or "")) for m in chat_history)
+
+
+class HistoryCompactor:
+    """
+    Keeps the history re-sent on every turn within max_history_chars (~4 characters per token) by
+    compacting the oldest tool results: truncate keeps their first compacted_chars characters, elide
+    drops them and summary keeps their shape and a shorter prefix. None disables compaction.
+    """
+
+    def __init__(self, max_history_chars: Optional[int] = None, compaction: str = "truncate", compacted_chars: int = 500):
+        if compaction not in COMPACTION_STRATEGIES:
+            raise ValueError(f"compaction must be one of {COMPACTION_STRATEGIES}")
+        self.max_history_chars = max_history_chars
+        self.compaction = compaction
+        self.compacted_chars = compacted_chars # what truncate/summary keep of an old tool result
+
+    def compact_content(self, message: ToolMessage) -> str:
+        content = str(message.content)
+        if self.compaction == "elide":
+            return f"[elided {len(content)} characters of {message.name} output]"
+
+        if self.compaction == "summary":
+            try:
+                value = ast.literal_eval(content)
+            except Exception: # not a Python literal, e.g. a transcript
+                value = None
+            if isinstance(value, dict):
+                shape = f"dict with keys {list(value)[:20]}"
+            elif isinstance(value, list):
+                shape = f"list of {len(value)} items"
+            else:
+                shape = f"{len(content)} characters of text"
+            return f"[summary of earlier {message.name} output: {shape}] {content[:self.compacted_chars // 2]}"
+
+        return f"{content[:self.compacted_chars]}... [truncated {len(content) - self.compacted_chars} characters]"
+
+    def compact(self, chat_history: List[BaseMessage], keep_last: int):
+        """Compact the oldest tool results of chat_history in place until it fits the character budget.
+
+        The last keep_last messages (the newest tool results) are never touched, and compacted
+        messages keep their tool_call_id so every tool call still has its answer.
+        """
+        if self.max_history_chars is None:
+            return
+
+        total = history_chars(chat_history)
+        for i, message in enumerate(chat_history[:len(chat_history) - keep_last]):
+            if total <= self.max_history_chars:
+                break
+            if not isinstance(message, ToolMessage) or message.additional_kwargs.get("compacted"):
+                continue
+
+            content = self.compact_content(message)
+            if len(content) >= len(str(message.content)):
+                continue
+
+            total -= len(str(message.content)) - len(content)
+            chat_history[i] = ToolMessage(
+                content=content,
+                name=message.name,
+                tool_call_id=message.tool_call_id,
+                additional_kwargs={"compacted": True}
+            )
@@ -1,8 +1,11 @@
 import os
+import sys
+from collections import deque
 from dotenv import load_dotenv
+from typing import Deque, List, Optional
 
 from langchain_cohere.chat_models import ChatCohere
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import HumanMessage
 
 from tools.extract_video_id import extract_video_id
 from tools.fetch_transcript import fetch_transcript
@@ -11,13 +14,19 @@ from tools.get_thumbnails import get_thumbnails
 from tools.get_trending_videos import get_trending_videos
 from tools.search_youtube import search_youtube
 
+# tool_loop.py is shared with the other agent of agent_tool_calling_manually
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tool_loop import METRICS_WINDOW, HistoryCompactor, history_chars, run_tool_calls
+
 load_dotenv()
 
 class Agent:
-    def __init__(self):
-        llm = ChatCohere(
-            cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+    def __init__(self, llm=None, cache=None, max_workers: int = 8, tool_timeout: float = 60.0,
+                 max_history_chars: Optional[int] = 24000, compaction: str = "truncate", compacted_chars: int = 500):
+        llm = llm or ChatCohere(
+            cohere_api_key=os.environ.get("CO_API_KEY"),
+            model="command-a-03-2025",
+            cache=cache
         )
 
         self.agent = llm.bind_tools(tools=[
@@ -25,7 +34,7 @@ class Agent:
         ])
 
         self.tool_map = {
-            "extract_video_id": extract_video_id, 
+            "extract_video_id": extract_video_id,
             "fetch_transcript": fetch_transcript,
             "get_full_metadata": get_full_metadata,
             "get_thumbnails": get_thumbnails,
@@ -33,27 +42,44 @@ class Agent:
             "search_youtube": search_youtube
         }
 
+        # all the tool calls of one LLM turn run in parallel, at most max_workers at a time
+        self.max_workers = max_workers
+        self.tool_timeout = tool_timeout # seconds all the tool calls of one turn may take together
+
+        # character budget of the history re-sent on every turn (~4 characters per token), None disables compaction
+        self.compactor = HistoryCompactor(max_history_chars, compaction, compacted_chars)
+
+        # number of LLM round trips each query needed, one entry per invoke (the last METRICS_WINDOW)
+        self.llm_round_trips: Deque[int] = deque(maxlen=METRICS_WINDOW)
+        # prompt size in characters of every LLM turn, one list per invoke (the last METRICS_WINDOW)
+        self.prompt_sizes: Deque[List[int]] = deque(maxlen=METRICS_WINDOW)
+
     def invoke(self, query: str) -> str:
         # Step 1: Initial user message
         chat_history = [HumanMessage(content=query)]
         print(f"chat history: {chat_history}\n\n")
 
+        round_trips = 0
+        prompt_sizes = []
+        self.prompt_sizes.append(prompt_sizes)
         while True:
-            # Step 2: LLM chooses tool
+            # Step 2: LLM chooses tools
+            prompt_sizes.append(history_chars(chat_history))
+            print(f"prompt size: {prompt_sizes[-1]} characters")
             response = self.agent.invoke(chat_history)
+            round_trips += 1
             print(f"llm response: {response}")
 
             if not response.tool_calls:
+                self.llm_round_trips.append(round_trips)
+                print(f"llm round trips: {round_trips}")
                 return response.content # Direct response, no tool needed
-            
-            # Step 3: Handle tool call
-            tool_name = response.tool_calls[0]["name"]
-            tool_args = response.tool_calls[0]["args"]
-            tool_call_id = response.tool_calls[0]["id"]
-
-            # Step 4: Call tool manually
-            tool_result = self.tool_map[tool_name].invoke(tool_args)
-
-            # Step 5: Send result back to LLM
-            tool_message = ToolMessage(content=str(tool_result), tool_call_id=tool_call_id)
-            chat_history.extend([response, tool_message])
+
+            # Step 3: Call every tool the LLM asked for in parallel
+            tool_messages = run_tool_calls(self.tool_map, response.tool_calls, self.tool_timeout, self.max_workers)
+
+            # Step 4: Send all the results back to LLM in one step
+            chat_history.extend([response, *tool_messages])
+
+            # Step 5: Keep the re-sent history within budget by compacting older tool results
+            self.compactor.compact(chat_history, keep_last=len(tool_messages))
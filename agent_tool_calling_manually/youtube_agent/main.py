@@ -1,6 +1,8 @@
 from agent import Agent
+from tools.video_info_cache import video_info_cache
 
 agent = Agent()
 query = "I want to summarize youtube video: https://www.youtube.com/watch?v=T-D1OfcDW1M in english"
 resp = agent.invoke(query=query)
-print(resp)
\ No newline at end of file
+print(resp)
+print(f"video info cache: {video_info_cache.stats()}")
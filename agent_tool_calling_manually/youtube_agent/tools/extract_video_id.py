@@ -1,6 +1,14 @@
 import re
 from langchain.tools import tool
 
+# Regex pattern to match video IDs
+VIDEO_ID_PATTERN = re.compile(r'(?:v=|be/|embed/)([a-zA-Z0-9_-]{11})')
+
+def parse_video_id(url: str):
+    """Returns the 11-character video ID found in the URL, or None."""
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
 @tool
 def extract_video_id(url: str) -> str:
     """
@@ -13,7 +21,4 @@ def extract_video_id(url: str) -> str:
         str: Extracted video ID or error message if parsing fails.
     """
     
-    # Regex pattern to match video IDs
-    pattern = r'(?:v=|be/|embed/)([a-zA-Z0-9_-]{11})'
-    match = re.search(pattern, url)
-    return match.group(1) if match else "Error: Invalid YouTube URL"
\ No newline at end of file
+    return parse_video_id(url) or "Error: Invalid YouTube URL"
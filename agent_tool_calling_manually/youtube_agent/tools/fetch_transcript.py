@@ -1,22 +1,32 @@
-from youtube_transcript_api import YouTubeTranscriptApi
+from typing import Iterator, Optional
 from langchain.tools import tool
 
+from tools.transcript_store import transcript_store
+
 @tool
-def fetch_transcript(video_id: str, language: str = "en") -> str:
+def fetch_transcript(video_id: str, language: str = "en", start: int = 0, max_chars: Optional[int] = None) -> str:
     """
     Fetches the transcript of a YouTube video.
-    
+
     Args:
         video_id (str): The YouTube video ID (e.g., "dQw4w9WgXcQ").
         language (str): Language code for the transcript (e.g., "en", "es").
-    
+        start (int): Character offset to start reading the transcript from.
+        max_chars (int): Maximum number of characters to return, the whole transcript if omitted.
+
     Returns:
         str: The transcript text or an error message.
     """
-    
+
     try:
-        ytt_api = YouTubeTranscriptApi()
-        transcript = ytt_api.fetch(video_id, languages=[language])
-        return " ".join([snippet.text for snippet in transcript.snippets])
+        transcript = transcript_store.fetch(video_id, language)
+        end = start + max_chars if max_chars is not None else None
+        return transcript[start:end]
     except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+        return f"Error: {str(e)}"
+
+def iter_transcript_chunks(video_id: str, language: str = "en", chunk_size: int = 4000) -> Iterator[str]:
+    """Yields the transcript in chunks of at most chunk_size characters."""
+    transcript = transcript_store.fetch(video_id, language)
+    for i in range(0, len(transcript), chunk_size):
+        yield transcript[i:i + chunk_size]
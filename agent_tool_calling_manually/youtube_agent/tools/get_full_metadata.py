@@ -1,21 +1,17 @@
 from langchain.tools import tool
-import yt_dlp
-import logging
 
-yt_dpl_logger = logging.getLogger("yt_dlp")
-yt_dpl_logger.setLevel(logging.ERROR)
+from tools.video_info_cache import video_info_cache
 
 @tool
 def get_full_metadata(url: str) -> dict:
     """Extract metadata given a YouTube URL, including title, views, duration, channel, likes, comments, and chapters."""
-    with yt_dlp.YoutubeDL({'quiet': True, 'logger': yt_dpl_logger}) as ydl:
-        info = ydl.extract_info(url, download=False)
-        return {
-            'title': info.get('title'),
-            'views': info.get('view_count'),
-            'duration': info.get('duration'),
-            'channel': info.get('uploader'),
-            'likes': info.get('like_count'),
-            'comments': info.get('comment_count'),
-            'chapters': info.get('chapters', [])
-        }
\ No newline at end of file
+    info = video_info_cache.get_info(url)
+    return {
+        'title': info.get('title'),
+        'views': info.get('view_count'),
+        'duration': info.get('duration'),
+        'channel': info.get('uploader'),
+        'likes': info.get('like_count'),
+        'comments': info.get('comment_count'),
+        'chapters': info.get('chapters', [])
+    }
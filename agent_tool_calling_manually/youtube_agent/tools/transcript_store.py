@@ -0,0 +1,115 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterable, Optional
+
+from youtube_transcript_api import YouTubeTranscriptApi
+
+
+class TranscriptStore:
+    """
+    On-disk transcript store keyed by (video_id, language).
+
+    Transcripts are kept zlib-compressed in SQLite, so a transcript is only downloaded once.
+    When the stored bytes go over max_bytes, the least recently read transcripts are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        # one YouTubeTranscriptApi client reused for every download
+        self.api = YouTubeTranscriptApi()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (video_id, language)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, video_id: str, language: str) -> Optional[str]:
+        """Return the stored transcript, or None when it has not been downloaded yet."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM transcripts WHERE video_id = ? AND language = ?", (video_id, language)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET last_access = ? WHERE video_id = ? AND language = ?",
+                (time.time(), video_id, language)
+            )
+            self._conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, video_id: str, language: str, text: str):
+        data = zlib.compress(text.encode("utf-8"), level=6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, language, data, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (video_id, language, data, len(data), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # caller holds the lock
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT video_id, language, size FROM transcripts ORDER BY last_access").fetchall()
+        for video_id, language, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM transcripts WHERE video_id = ? AND language = ?", (video_id, language))
+            total -= size
+
+    def fetch(self, video_id: str, language: str = "en") -> str:
+        """Return the transcript from disk, downloading and storing it on the first request."""
+        text = self.get(video_id, language)
+        if text is None:
+            transcript = self.api.fetch(video_id, languages=[language])
+            text = " ".join([snippet.text for snippet in transcript.snippets])
+            self.put(video_id, language, text)
+        return text
+
+    def preload(self, video_ids: Iterable[str], language: str = "en") -> dict:
+        """Download and store transcripts ahead of time. Returns video_id -> "ok" or the error."""
+        results = {}
+        for video_id in video_ids:
+            try:
+                self.fetch(video_id, language)
+                results[video_id] = "ok"
+            except Exception as e:
+                results[video_id] = f"Error: {str(e)}"
+        return results
+
+
+# one store shared by every tool in the process
+transcript_store = TranscriptStore(os.environ.get("TRANSCRIPT_STORE_PATH", "transcripts.sqlite3"))
+
+
+if __name__ == "__main__":
+    # preload transcripts from the youtube_agent folder:
+    #   python -m tools.transcript_store --language en T-D1OfcDW1M dQw4w9WgXcQ
+    parser = argparse.ArgumentParser(description="Preload YouTube transcripts into the local store.")
+    parser.add_argument("video_ids", nargs="+")
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    for video_id, status in transcript_store.preload(args.video_ids, args.language).items():
+        print(f"{video_id}: {status}")
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import yt_dlp
+
+from tools.extract_video_id import parse_video_id
+
+yt_dpl_logger = logging.getLogger("yt_dlp")
+yt_dpl_logger.setLevel(logging.ERROR)
+
+
+class VideoInfoCache:
+    """
+    Shared yt-dlp extraction layer for the video tools.
+
+    Info dicts are kept in an LRU with a TTL, keyed by the canonical video ID, so
+    get_full_metadata and get_thumbnails only extract a video once. Each worker thread
+    reuses its own YoutubeDL instance because YoutubeDL is not safe to share between threads.
+    Concurrent misses for the same video wait on a single extraction.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict() # video_id -> (stored_at, info)
+        self._in_flight = {} # video_id -> Future of the running extraction
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _ydl(self) -> yt_dlp.YoutubeDL:
+        if not hasattr(self._local, "ydl"):
+            self._local.ydl = yt_dlp.YoutubeDL({"quiet": True, "logger": yt_dpl_logger})
+        return self._local.ydl
+
+    def get_info(self, url: str) -> dict:
+        """Return the yt-dlp info dict for the video in the URL, extracting it only on a cache miss."""
+        video_id = parse_video_id(url)
+        if video_id is None:
+            # not a video URL we can key on, extract it without caching
+            return self._ydl().extract_info(url, download=False)
+
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(video_id)
+                self.hits += 1
+                return entry[1]
+
+            pending = self._in_flight.get(video_id)
+            is_owner = pending is None
+            if is_owner:
+                self.misses += 1
+                pending = self._in_flight[video_id] = Future()
+            else:
+                self.hits += 1
+
+        if not is_owner:
+            # another thread is already extracting this video
+            return pending.result()
+
+        try:
+            info = self._ydl().extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[video_id]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[video_id]
+            self._entries[video_id] = (time.monotonic(), info)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        pending.set_result(info)
+        return info
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# one cache shared by every tool in the process
+video_info_cache = VideoInfoCache()
@@ -0,0 +1,272 @@
+"""
+Offline benchmark suite for every agent in the repository.
+
+Each workflow runs against FakeChatModel with a scripted conversation, so no network or API key
+is needed. For every workflow the report holds, per request: wall time, LLM calls, tool calls,
+prompt characters and peak Python memory (tracemalloc, measured in a second pass so it does not
+skew the wall time).
+
+Run from the repository root:
+    python benchmarks/agent_benchmarks.py --requests 20 --latency-ms 50 --output bench_output.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from langchain_core.messages import HumanMessage
+
+from agent_loader import load_agent_module
+from fake_llm import (
+    FakeChatModel,
+    FakeSearchTool,
+    LatencyModel,
+    ScriptedResponder,
+    count_react_steps,
+    count_tool_messages,
+    tool_call,
+)
+from percentiles import percentile
+
+# tools that build API clients at import time, they are never called by the scripted runs
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+os.environ.setdefault("TRANSCRIPT_STORE_PATH", os.path.join(tempfile.gettempdir(), "benchmark_transcripts.sqlite3"))
+
+
+class BenchmarkCase:
+    """One workflow: how to build the agent, what the fake LLM answers and how to run a request."""
+
+    def __init__(
+        self,
+        agent_dir: str,
+        responder: ScriptedResponder,
+        build: Callable[[Any, FakeChatModel], Any],
+        run: Callable[[Any], Any]
+    ):
+        self.agent_dir = agent_dir
+        self.responder = responder
+        self.build = build
+        self.run = run
+
+
+def _after_tool_messages(n: int):
+    return lambda messages, tools: count_tool_messages(messages) >= n
+
+
+def _after_react_steps(n: int):
+    return lambda messages, tools: count_react_steps(messages) >= n
+
+
+def _sqlite_db() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="agent_bench_"), "processes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE processes (id INTEGER PRIMARY KEY, name TEXT, status TEXT)")
+    conn.executemany(
+        "INSERT INTO processes (name, status) VALUES (?, ?)",
+        [("onboarding", "open"), ("billing", "closed"), ("audit", "open")]
+    )
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+def _students_df():
+    import pandas as pd
+
+    return pd.DataFrame({
+        "sex": ["F", "M", "F", "M"] * 25,
+        "age": [15, 16, 17, 19] * 25,
+        "G3": [10, 12, 14, 8] * 25
+    })
+
+
+REFLEXION_ANSWER = {
+    "answer": "Eggs and avocado, avoid sugary cereal.",
+    "reflection": {"missing": "Clinical evidence", "superfluous": "None"},
+    "search_queries": ["eggs blood sugar", "breakfast heart disease"]
+}
+
+CASES: Dict[str, BenchmarkCase] = {
+    "math": BenchmarkCase(
+        "agent_tool_calling_manually/simple_math_problems_agent",
+        ScriptedResponder([
+            (_after_tool_messages(2), "The result is 7."),
+            (_after_tool_messages(1), tool_call("subtract_numbers", {"inputs": "10 3"})),
+        ], default=tool_call("divide_numbers", {"inputs": "9 3 1"})),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke("Divide 9, 3 and 1 and subtract the result from 10")
+    ),
+    "youtube": BenchmarkCase(
+        "agent_tool_calling_manually/youtube_agent",
+        ScriptedResponder([
+            (_after_tool_messages(1), "The video explains agents."),
+        ], default=tool_call("extract_video_id", {"url": "https://www.youtube.com/watch?v=T-D1OfcDW1M"})),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke("Summarize https://www.youtube.com/watch?v=T-D1OfcDW1M")
+    ),
+    "clothing": BenchmarkCase(
+        "create_react_agent/clothing_recommendation_agent.py",
+        ScriptedResponder([
+            (_after_tool_messages(1), "Wear a light jacket."),
+        ], default=tool_call("recommend_clothing", {"weather": "Overcast, 64.9°F"})),
+        build=lambda module, llm: module.ClothingRecommendationAgent(llm=llm),
+        run=lambda agent: agent.invoke({"messages": [HumanMessage(content="What should I wear in Zurich?")]})
+    ),
+    "sql": BenchmarkCase(
+        "sql_agent",
+        ScriptedResponder([
+            (_after_react_steps(2), "Thought: I now know the final answer\nFinal Answer: 3"),
+            (_after_react_steps(1), "Thought: I should count them.\nAction: sql_db_query\nAction Input: SELECT COUNT(*) FROM processes"),
+        ], default="Thought: I should look at the tables.\nAction: sql_db_list_tables\nAction Input: "),
+        build=lambda module, llm: module.Agent(llm=llm, db_uri=_sqlite_db(), query_examples=False),
+        run=lambda agent: agent.invoke("How many processes have been registered so far?")
+    ),
+    "pandas": BenchmarkCase(
+        "create_pandas_dataframe_agent",
+        ScriptedResponder([
+            (_after_react_steps(1), "Thought: I now know the final answer\nFinal Answer: 100"),
+        ], default="Thought: I should count the rows.\nAction: python_repl_ast\nAction Input: len(df)"),
+        build=lambda module, llm: module.Agent(llm=llm, df=_students_df()),
+        run=lambda agent: agent.invoke("How many rows of data are in this file?")
+    ),
+    "reflection": BenchmarkCase(
+        "reflection_agent",
+        ScriptedResponder([
+            ("Here's the LinkedIn post draft", "Add a clear call to action."),
+        ], default="Landed a developer job at IBM! #career"),
+        build=lambda module, llm: module.ReflectionAgent(llm=llm),
+        run=lambda agent: agent.call({"messages": [HumanMessage(content="Write a LinkedIn post about IBM")]})
+    ),
+    "reflexion": BenchmarkCase(
+        "reflexion_agent",
+        ScriptedResponder([
+            ("tool:ReviseAnswer", tool_call("ReviseAnswer", {**REFLEXION_ANSWER, "references": ["https://example.com"]})),
+            ("tool:AnswerQuestion", tool_call("AnswerQuestion", REFLEXION_ANSWER)),
+        ]),
+        build=lambda module, llm: module.ReflexionAgent(llm=llm, search_tool=FakeSearchTool()),
+        run=lambda agent: agent.invoke("What breakfast should a pre-diabetic eat?")
+    ),
+    "orchestrator_worker": BenchmarkCase(
+        "multi_agent_workflows/orchestrator_worker",
+        ScriptedResponder([
+            ("tool:Dishes", tool_call("Dishes", {"sections": [
+                {"name": "Steak and eggs", "ingredients": ["steak", "eggs"], "location": "American"},
+                {"name": "Tacos", "ingredients": ["tortilla", "beef"], "location": "Mexican"},
+                {"name": "Chili", "ingredients": ["beans", "chili"], "location": "Tex-Mex"},
+            ]})),
+        ], default="Hello, I am a chef. Here is how to cook it."),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke({"meals": "Steak and eggs, tacos, and chili"})
+    ),
+    "parallelization": BenchmarkCase(
+        "multi_agent_workflows/parallelization",
+        ScriptedResponder(default="Bonjour !"),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke({"text": "Good morning! I hope you have a wonderful day."})
+    ),
+    "prompt_chaining": BenchmarkCase(
+        "multi_agent_workflows/prompt_chaining",
+        ScriptedResponder(default="Experienced data scientist with NLP background."),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke({"job_description": "Data scientist with NLP and Python."})
+    ),
+    "routing_pattern": BenchmarkCase(
+        "multi_agent_workflows/routing_pattern",
+        ScriptedResponder([
+            ("tool:Router", tool_call("Router", {"role": "translate"})),
+        ], default="J'adore programmer."),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke({"user_input": "Can you translate this sentence: I love programming?"})
+    ),
+    "reflection_pattern": BenchmarkCase(
+        "multi_agent_workflows/reflection_pattern",
+        ScriptedResponder([
+            ("tool:Feedback", tool_call("Feedback", {"grade": "aggressive", "feedback": "Growth heavy plan."})),
+            ("Return ONLY the grade", "aggressive"),
+        ], default="Invest in AI and renewable energy ETFs."),
+        build=lambda module, llm: module.Agent(llm=llm),
+        run=lambda agent: agent.invoke({"investor_profile": "Age: 29\nRisk tolerance: High"})
+    ),
+}
+
+
+def _mean(values: List[float]) -> float:
+    return round(statistics.mean(values), 3) if values else 0.0
+
+
+def run_case(case: BenchmarkCase, requests: int, latency: LatencyModel, measure_memory: bool = True) -> dict:
+    module = load_agent_module(case.agent_dir)
+    llm = FakeChatModel(responder=case.responder, latency=latency)
+    agent = case.build(module, llm)
+
+    wall_ms, per_request = [], []
+    for _ in range(requests):
+        llm.stats.reset()
+        start = time.perf_counter()
+        # the agents print their intermediate steps, keep them out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            case.run(agent)
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        per_request.append(llm.stats.snapshot())
+
+    peak_kb = []
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            for _ in range(requests):
+                tracemalloc.reset_peak()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    case.run(agent)
+                peak_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "wall_ms_mean": _mean(wall_ms),
+        "wall_ms_p95": round(percentile(wall_ms, 0.95), 3),
+        "llm_calls": _mean([r["llm_calls"] for r in per_request]),
+        "tool_calls": _mean([r["tool_calls"] for r in per_request]),
+        "prompt_chars": _mean([r["prompt_chars"] for r in per_request]),
+        "peak_memory_kb": _mean(peak_kb),
+    }
+
+
+def run(names: List[str], requests: int, latency: LatencyModel, measure_memory: bool = True) -> dict:
+    return {name: run_case(CASES[name], requests, latency, measure_memory) for name in names}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark of every agent with a fake LLM.")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Workflows to run (default: all)")
+    parser.add_argument("--latency", choices=["constant", "uniform", "lognormal"], default="constant")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean (or median) latency of one LLM call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--ms-per-1k-prompt-chars", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    args = parser.parse_args()
+
+    latency = LatencyModel(
+        distribution=args.latency,
+        mean_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        ms_per_1k_prompt_chars=args.ms_per_1k_prompt_chars,
+        seed=args.seed
+    )
+    report = run(args.only or list(CASES), args.requests, latency, measure_memory=not args.no_memory)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
@@ -0,0 +1,7 @@
+# the loader is shared with serving/, this keeps the flat "from agent_loader import ..." of the benchmark scripts
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_loading.agent_loader import REPO_ROOT, load_agent_module  # noqa: E402
@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+import zlib
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, Field
+
+
+def messages_to_text(messages: List[BaseMessage]) -> str:
+    """Flatten a list of messages into one string so responders can match on it."""
+    return "\n".join(str(m.content) for m in messages)
+
+
+def tool_names(tools: Optional[List[dict]]) -> List[str]:
+    """Names of the tools bound to the model (OpenAI tool format)."""
+    return [t["function"]["name"] for t in tools or []]
+
+
+def count_tool_messages(messages: List[BaseMessage]) -> int:
+    return sum(isinstance(m, ToolMessage) for m in messages)
+
+
+def count_react_steps(messages: List[BaseMessage]) -> int:
+    """Number of completed Action/Observation steps in a text ReAct prompt (ZERO_SHOT_REACT agents)."""
+    text = messages_to_text(messages)
+    # the format instructions of the prompt contain one "Observation:" line of their own
+    return text.count("Observation:") - text.count("Observation: the result of the action")
+
+
+def tool_call(name: str, args: dict) -> dict:
+    """A scripted tool call, the fake model assigns the call id when it answers."""
+    return {"name": name, "args": args}
+
+
+class LatencyModel:
+    """
+    Latency of one fake LLM call in milliseconds.
+
+    distribution is "constant" (mean_ms), "uniform" (mean_ms +- jitter_ms) or "lognormal"
+    (median mean_ms, shape sigma). ms_per_1k_prompt_chars adds a cost that grows with the prompt.
+    """
+
+    def __init__(
+        self,
+        distribution: str = "constant",
+        mean_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        sigma: float = 0.5,
+        ms_per_1k_prompt_chars: float = 0.0,
+        seed: int = 0
+    ):
+        if distribution not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.sigma = sigma
+        self.ms_per_1k_prompt_chars = ms_per_1k_prompt_chars
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self, prompt_chars: int = 0) -> float:
+        with self._lock:
+            if self.distribution == "uniform":
+                base = self._random.uniform(self.mean_ms - self.jitter_ms, self.mean_ms + self.jitter_ms)
+            elif self.distribution == "lognormal" and self.mean_ms > 0:
+                base = self._random.lognormvariate(0, self.sigma) * self.mean_ms
+            else:
+                base = self.mean_ms
+        return max(0.0, base) + prompt_chars / 1000 * self.ms_per_1k_prompt_chars
+
+
+# itertools.count is thread-safe under the GIL, ids stay unique across concurrent calls
+_call_ids = itertools.count(1)
+
+Rule = Tuple[Union[str, Callable[[List[BaseMessage], List[dict]], bool]], Any]
+
+
+class ScriptedResponder:
+    """
+    Picks the scripted answer for a prompt.
+
+    Each rule is (match, response). match is a substring of the prompt, a bound tool name
+    prefixed with "tool:", or a predicate(messages, tools). response is a string, a tool_call()
+    dict, a list of tool_call() dicts, an AIMessage or a callable(messages, tools) returning one
+    of those. The first matching rule wins, otherwise default is used.
+    """
+
+    def __init__(self, rules: Sequence[Rule] = (), default: Any = "OK"):
+        self.rules = list(rules)
+        self.default = default
+
+    def _matches(self, match, messages, tools) -> bool:
+        if callable(match):
+            return match(messages, tools)
+        if match.startswith("tool:"):
+            return match[len("tool:"):] in tool_names(tools)
+        return match in messages_to_text(messages)
+
+    def __call__(self, messages: List[BaseMessage], tools: List[dict]):
+        response = self.default
+        for match, rule_response in self.rules:
+            if self._matches(match, messages, tools):
+                response = rule_response
+                break
+
+        if callable(response):
+            response = response(messages, tools)
+        return response
+
+
+class FakeLLMStats:
+    """Counters shared by a fake model and every runnable bound from it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.prompt_chars = 0
+            self.tool_calls = 0
+
+    def record(self, prompt_chars: int, tool_calls: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += prompt_chars
+            self.tool_calls += tool_calls
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"llm_calls": self.calls, "prompt_chars": self.prompt_chars, "tool_calls": self.tool_calls}
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic, offline stand-in for ChatCohere.
+
+    The responder receives the prompt messages and the bound tools and returns a string, a
+    tool_call() dict, a list of them or a ready AIMessage, so it can answer plain prompts,
+    tool calling and with_structured_output(). Every call sleeps for a latency drawn from the
+    latency model and is counted in stats.
+
+    stream() splits the answer into pieces of stream_chunk_chars characters (tool call arguments
+    arrive as JSON fragments in tool_call_chunks) and spreads the latency evenly over them.
+    """
+
+    responder: Callable[[List[BaseMessage], List[dict]], Any]
+    latency: LatencyModel = Field(default_factory=LatencyModel)
+    stats: FakeLLMStats = Field(default_factory=FakeLLMStats)
+    stream_chunk_chars: int = 16
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def calls(self) -> int:
+        return self.stats.calls
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        # with_structured_output() binds its schema as a tool, those calls are not counted as tool use
+        structured_output = "ls_structured_output_format" in kwargs
+        return super().bind(tools=formatted_tools, structured_output=structured_output, **kwargs)
+
+    def _respond(self, messages, tools) -> Tuple[AIMessage, float, int]:
+        response = self.responder(messages, tools or [])
+
+        if isinstance(response, dict):
+            response = [response]
+
+        if isinstance(response, AIMessage):
+            message = response
+        elif isinstance(response, list):
+            # fresh ids so tool_call_id pairing works across calls
+            message = AIMessage(content="", tool_calls=[
+                {**call, "id": call.get("id") or f"call_{next(_call_ids)}"} for call in response
+            ])
+        else:
+            message = AIMessage(content=str(response))
+
+        prompt_chars = len(messages_to_text(messages))
+        return message, self.latency.sample_ms(prompt_chars) / 1000, prompt_chars
+
+    def _tool_calls_made(self, message: AIMessage, structured_output: bool) -> int:
+        if structured_output:
+            return 0
+        # text ReAct agents ask for a tool with an "Action:" line instead of a tool call
+        return len(message.tool_calls) or str(message.content).count("Action:")
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, structured_output=False, **kwargs) -> ChatResult:
+        message, delay, prompt_chars = self._respond(messages, tools)
+        time.sleep(delay)
+        self.stats.record(prompt_chars, self._tool_calls_made(message, structured_output))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, structured_output=False, **kwargs) -> ChatResult:
+        message, delay, prompt_chars = self._respond(messages, tools)
+        await asyncio.sleep(delay)
+        self.stats.record(prompt_chars, self._tool_calls_made(message, structured_output))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _pieces(self, text: str) -> List[str]:
+        size = max(1, self.stream_chunk_chars)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def _chunks(self, message: AIMessage) -> List[AIMessageChunk]:
+        chunks = [AIMessageChunk(content=piece) for piece in self._pieces(str(message.content))] if message.content else []
+        for index, call in enumerate(message.tool_calls):
+            for i, piece in enumerate(self._pieces(json.dumps(call["args"]))):
+                # like the real providers, only the first fragment of a call carries its name and id
+                chunks.append(AIMessageChunk(content="", tool_call_chunks=[{
+                    "name": call["name"] if i == 0 else None,
+                    "args": piece,
+                    "id": call["id"] if i == 0 else None,
+                    "index": index
+                }]))
+        return chunks or [AIMessageChunk(content="")]
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, structured_output=False, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message, delay, prompt_chars = self._respond(messages, tools)
+        chunks = self._chunks(message)
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield ChatGenerationChunk(message=chunk)
+        self.stats.record(prompt_chars, self._tool_calls_made(message, structured_output))
+
+
+class FakeSearchTool:
+    """Stand-in for TavilySearchResults with the same invoke() interface."""
+
+    def __init__(self, latency: LatencyModel = None):
+        self.latency = latency or LatencyModel()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, query: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency.sample_ms() / 1000)
+        return [{"url": f"https://example.com/{zlib.crc32(query.encode())}", "content": f"Result for {query}"}]
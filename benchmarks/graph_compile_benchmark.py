@@ -0,0 +1,90 @@
+"""
+Per-request latency of the StateGraph agents when the graph is rebuilt and compiled on every
+request (the old behaviour) versus reusing the graph compiled once in __init__.
+
+Run from the repository root:
+    python benchmarks/graph_compile_benchmark.py --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, tool_call, tool_names
+from percentiles import percentile
+
+# the clothing agent builds a Tavily client at import time, it is never called here
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+STRUCTURED_OUTPUTS = {
+    "Router": {"role": "translate"},
+    "Dishes": {"sections": [{"name": "Tacos", "ingredients": ["tortilla", "beef"], "location": "Mexican"}]},
+    "Feedback": {"grade": "moderate", "feedback": "Balanced plan."},
+}
+
+
+def stub_responder(messages, tools):
+    """Answer structured output / router calls with canned tool calls and everything else with text."""
+    for name in tool_names(tools):
+        if name in STRUCTURED_OUTPUTS:
+            return tool_call(name, STRUCTURED_OUTPUTS[name])
+    # the reflection_pattern grade prompt must come back as a valid grade
+    return "moderate"
+
+
+WORKFLOWS = {
+    "orchestrator_worker": ("multi_agent_workflows/orchestrator_worker", "Agent", {"meals": "tacos"}),
+    "parallelization": ("multi_agent_workflows/parallelization", "Agent", {"text": "Good morning!"}),
+    "prompt_chaining": ("multi_agent_workflows/prompt_chaining", "Agent", {"job_description": "Data scientist"}),
+    "routing_pattern": ("multi_agent_workflows/routing_pattern", "Agent", {"user_input": "Translate: I love programming"}),
+    "reflection_pattern": ("multi_agent_workflows/reflection_pattern", "Agent", {"investor_profile": "Age: 29"}),
+    "clothing_recommendation": (
+        "create_react_agent/clothing_recommendation_agent.py",
+        "ClothingRecommendationAgent",
+        {"messages": [HumanMessage(content="What should I wear in Zurich?")]},
+    ),
+}
+
+
+def _latencies_ms(fn, requests):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _summary(latencies):
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+    }
+
+
+def run(requests: int):
+    report = {}
+    for name, (agent_dir, class_name, user_input) in WORKFLOWS.items():
+        module = load_agent_module(agent_dir)
+        agent = getattr(module, class_name)(llm=FakeChatModel(responder=stub_responder))
+
+        # old behaviour: build and compile the StateGraph inside every request
+        before = _latencies_ms(lambda: agent._build_graph().invoke(user_input), requests)
+        # new behaviour: the graph compiled in __init__ is reused
+        after = _latencies_ms(lambda: agent.graph.invoke(user_input), requests)
+
+        report[name] = {"compile_per_request": _summary(before), "compiled_once": _summary(after)}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.requests), indent=2))
@@ -0,0 +1,104 @@
+"""
+LLM cache hits of the temperature 0 chains: the reflection pattern grade, the routing pattern router
+and translation, and the parallelization translations are each run twice with the same input through
+a TieredLLMCache, which only keeps calls pinned to temperature 0. The second run of every chain must
+be answered by the cache without calling the model.
+
+It also checks that a temperature bound over the model's own (model(temperature=0).bind(temperature=0.7))
+is the one that decides whether a call is cached, and that prompts that differ only in whitespace
+get their own entries. The script exits non-zero when any check fails.
+
+Run from the repository root:
+    python benchmarks/llm_cache_temperature.py
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+
+from agent_loader import REPO_ROOT, load_agent_module
+from fake_llm import FakeChatModel, ScriptedResponder, tool_call
+
+sys.path.insert(0, REPO_ROOT)
+from caching.llm_cache import TieredLLMCache, is_deterministic  # noqa: E402
+
+PROFILE = "35 years old, stable income, saving for retirement in 30 years, can stomach some volatility."
+
+
+def _grade(module, llm):
+    agent = module.Agent(llm=llm)
+    return lambda: agent.grade_pipe.invoke({"investor_profile": PROFILE})
+
+
+def _route(module, llm):
+    agent = module.Agent(llm=llm)
+    return lambda: agent.invoke({"user_input": "Translate this to French: the meeting moved to Tuesday."})
+
+
+def _translate(module, llm):
+    agent = module.Agent(llm=llm, languages=["French", "Spanish"])
+    return lambda: agent.invoke({"text": "The meeting moved to Tuesday."})
+
+
+CHAINS = {
+    "reflection_pattern_grade": ("multi_agent_workflows/reflection_pattern", _grade, ScriptedResponder(default="moderate")),
+    "routing_pattern_router_translate": (
+        "multi_agent_workflows/routing_pattern", _route,
+        ScriptedResponder(rules=[("tool:Router", tool_call("Router", {"role": "translate"}))], default="La réunion a été déplacée à mardi.")
+    ),
+    "parallelization_translate": ("multi_agent_workflows/parallelization", _translate, ScriptedResponder(default="Translated.")),
+}
+
+
+def run(names) -> dict:
+    report = {}
+    for name in names:
+        agent_dir, make_call, responder = CHAINS[name]
+        cache = TieredLLMCache(path=None)
+        llm = FakeChatModel(responder=responder, cache=cache)
+        call = make_call(load_agent_module(agent_dir), llm)
+
+        runs = []
+        # the agents print their progress, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(2):
+                before = llm.calls
+                call()
+                runs.append(llm.calls - before)
+        report[name] = {"llm_calls_first_run": runs[0], "llm_calls_second_run": runs[1], "cache": dict(cache.stats)}
+        report[name]["second_run_cached"] = runs[1] == 0 and cache.stats["memory_hits"] >= runs[0]
+    return report
+
+
+def _serialized_llm_string(model_temperature, call_temperature=None) -> str:
+    # the "<model JSON>---<call params>" form LangChain gives for serializable models
+    params = {"stop": None, **({"temperature": call_temperature} if call_temperature is not None else {})}
+    return json.dumps({"kwargs": {"temperature": model_temperature}}) + "---" + str(sorted(params.items()))
+
+
+def check_cache_rules() -> dict:
+    checks = {
+        "model 0, bound 0.7 is not cached": not is_deterministic(_serialized_llm_string(0, 0.7)),
+        "model 0.7, bound 0 is cached": is_deterministic(_serialized_llm_string(0.7, 0)),
+        "model 0, nothing bound is cached": is_deterministic(_serialized_llm_string(0)),
+        "params only, 0.7 is not cached": not is_deterministic(str(sorted({"stop": None, "temperature": 0.7}.items()))),
+    }
+
+    # code whose indentation differs is a different prompt
+    llm = FakeChatModel(responder=ScriptedResponder(default="ok"), cache=TieredLLMCache(path=None)).bind(temperature=0)
+    for prompt in ("def f():\n    return 1", "def f():\n  return 1", "def f(): return 1"):
+        llm.invoke(prompt)
+    checks["whitespace-only differences are separate entries"] = llm.bound.calls == 3
+    return checks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the temperature 0 chains are answered by the LLM cache when repeated.")
+    parser.add_argument("--only", nargs="+", choices=sorted(CHAINS), help="Chains to check (default: all)")
+    args = parser.parse_args()
+
+    report = run(args.only or sorted(CHAINS))
+    rules = check_cache_rules()
+    print(json.dumps({"chains": report, "cache_rules": rules}, indent=2))
+    sys.exit(0 if all(chain["second_run_cached"] for chain in report.values()) and all(rules.values()) else 1)
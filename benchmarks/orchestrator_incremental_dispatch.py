@@ -0,0 +1,80 @@
+"""
+Overlap of planning and cooking in the orchestrator_worker workflow.
+
+With incremental_dispatch the orchestrator streams the Dishes tool call and starts a chef as soon
+as each dish of the plan is complete. The fake model streams the plan in small JSON fragments
+spread over its latency, and a callback handler records when the planner call ends and when each
+chef call starts. The report shows the first chef starting before the plan is finished.
+
+Run from the repository root:
+    python benchmarks/orchestrator_incremental_dispatch.py --dishes 5 --latency-ms 300
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, LatencyModel, ScriptedResponder, messages_to_text, tool_call
+
+
+class Timeline(BaseCallbackHandler):
+    """Milliseconds, from the start of the request, at which planner and chef calls start and end."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = []
+        self._kinds = {}
+
+    def _now_ms(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 3)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        kind = "chef" if "world-class chef" in messages_to_text(messages[0]) else "planner"
+        self._kinds[run_id] = kind
+        self.events.append((f"{kind}_start", self._now_ms()))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self.events.append((f"{self._kinds.get(run_id, 'llm')}_end", self._now_ms()))
+
+    def first(self, name: str) -> float:
+        return min(ms for event, ms in self.events if event == name)
+
+
+def run(dishes: int, latency_ms: float, incremental_dispatch: bool) -> dict:
+    module = load_agent_module("multi_agent_workflows/orchestrator_worker")
+    sections = [{"name": f"Dish {i}", "ingredients": ["salt", "pepper"], "location": "Italian"} for i in range(dishes)]
+    responder = ScriptedResponder([
+        ("tool:Dishes", tool_call("Dishes", {"sections": sections})),
+    ], default="Hello, I am the chef. Here is how to cook it.")
+    llm = FakeChatModel(responder=responder, latency=LatencyModel(distribution="constant", mean_ms=latency_ms))
+    agent = module.Agent(llm=llm, max_workers=dishes, incremental_dispatch=incremental_dispatch)
+
+    timeline = Timeline()
+    # the agent prints every step, keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = agent.graph.invoke({"meals": "any"}, config={**agent.config, "callbacks": [timeline]})
+    total_ms = timeline._now_ms()
+
+    planning_end_ms = timeline.first("planner_end")
+    first_chef_ms = timeline.first("chef_start")
+    return {
+        "incremental_dispatch": incremental_dispatch,
+        "dishes": len(state["completed_menu"]),
+        "planning_end_ms": planning_end_ms,
+        "first_chef_start_ms": first_chef_ms,
+        "first_chef_before_planning_end": first_chef_ms < planning_end_ms,
+        "total_ms": total_ms,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chef workers dispatched while the orchestrator plan is still streaming.")
+    parser.add_argument("--dishes", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latency of one fake LLM call")
+    args = parser.parse_args()
+
+    print(json.dumps([run(args.dishes, args.latency_ms, mode) for mode in (False, True)], indent=2))
@@ -0,0 +1,74 @@
+"""
+Time to first content of the orchestrator_worker meal guide: invoke() versus stream().
+
+invoke() only returns when the slowest chef is done, stream() yields each dish guide as soon as
+its chef finishes. The fake chefs have a lognormal latency so one slow chef dominates invoke().
+With --incremental-dispatch the chefs run inside the orchestrator node while the plan streams, and
+stream() still gets each guide when its chef finishes (dish_guide_gaps_ms shows they arrive apart).
+
+Run from the repository root:
+    python benchmarks/orchestrator_streaming.py --requests 20 --dishes 5 --latency-ms 100
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, LatencyModel, ScriptedResponder, tool_call
+
+
+def run(requests: int, dishes: int, latency: LatencyModel, incremental_dispatch: bool = False) -> dict:
+    module = load_agent_module("multi_agent_workflows/orchestrator_worker")
+    sections = [{"name": f"Dish {i}", "ingredients": ["salt"], "location": "Italian"} for i in range(dishes)]
+    responder = ScriptedResponder([
+        ("tool:Dishes", tool_call("Dishes", {"sections": sections})),
+    ], default="Hello, I am the chef. Here is how to cook it.")
+    # no guide is kept between requests, every request cooks every dish again
+    agent = module.Agent(llm=FakeChatModel(responder=responder, latency=latency), max_workers=dishes,
+                         dish_cache=module.DishCache(max_entries=0), incremental_dispatch=incremental_dispatch)
+    user_input = {"meals": ", ".join(s["name"] for s in sections)}
+
+    invoke_ms, first_ms, final_ms, gaps_ms = [], [], [], []
+    # the agent prints every step, keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(requests):
+            start = time.perf_counter()
+            agent.invoke(user_input)
+            invoke_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            guides_ms = []
+            for event in agent.stream(user_input):
+                if "dish_guide" in event:
+                    guides_ms.append((time.perf_counter() - start) * 1000)
+            first_ms.append(guides_ms[0])
+            gaps_ms.append(guides_ms[-1] - guides_ms[0])
+            final_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "requests": requests,
+        "dishes": dishes,
+        "incremental_dispatch": incremental_dispatch,
+        "invoke_ms_mean": round(statistics.mean(invoke_ms), 3),
+        "stream_first_dish_ms_mean": round(statistics.mean(first_ms), 3),
+        "stream_final_guide_ms_mean": round(statistics.mean(final_ms), 3),
+        # time between the first and the last dish guide of a stream, about 0 when they arrive together
+        "dish_guide_gaps_ms_mean": round(statistics.mean(gaps_ms), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first content of the streaming orchestrator_worker agent.")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--dishes", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Median latency of one fake LLM call")
+    parser.add_argument("--sigma", type=float, default=0.8, help="Spread of the lognormal latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--incremental-dispatch", action="store_true", help="Dispatch the chefs while the plan streams")
+    args = parser.parse_args()
+
+    latency = LatencyModel(distribution="lognormal", mean_ms=args.latency_ms, sigma=args.sigma, seed=args.seed)
+    print(json.dumps(run(args.requests, args.dishes, latency, args.incremental_dispatch), indent=2))
@@ -0,0 +1,67 @@
+"""
+Dtypes and memory of the pandas agent dataset after load_dataset(): a generated students CSV
+goes through the downcast and the Feather cache, then the columns are checked. Repetitive text
+columns must be categoricals (read_csv gives object columns on older pandas and the string dtype
+on pandas 3), integers the smallest int type and floats float32. Exits non-zero when a column
+has another dtype.
+
+Run from the repository root:
+    python benchmarks/pandas_dataset_dtypes.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from agent_loader import REPO_ROOT
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "create_pandas_dataframe_agent"))
+from dataset_loader import load_dataset  # noqa: E402
+
+EXPECTED = {"school": "category", "sex": "category", "name": "str", "age": "int8", "absences": "int16", "G3": "float32"}
+
+
+def _students_csv(folder: str, rows: int) -> str:
+    path = os.path.join(folder, "students.csv")
+    pd.DataFrame({
+        "school": ["GP", "MS"] * (rows // 2),
+        "sex": ["F", "M", "F", "M"] * (rows // 4),
+        # unique per row, stays text
+        "name": [f"student {i}" for i in range(rows)],
+        "age": [15, 16, 17, 19] * (rows // 4),
+        "absences": [0, 4, 300, 2] * (rows // 4),
+        "G3": [10.5, 12.0, 14.25, 8.0] * (rows // 4),
+    }).to_csv(path, index=False)
+    return path
+
+
+def run(rows: int) -> dict:
+    folder = tempfile.mkdtemp(prefix="dataset_dtypes_bench_")
+    source = _students_csv(folder, rows)
+    raw = pd.read_csv(source)
+    df = load_dataset(source, cache_dir=os.path.join(folder, "cache"))
+
+    dtypes = {column: str(dtype) for column, dtype in df.dtypes.items()}
+    return {
+        "pandas": pd.__version__,
+        "rows": rows,
+        "read_csv_dtypes": {column: str(dtype) for column, dtype in raw.dtypes.items()},
+        "dtypes": dtypes,
+        # "str" on pandas 3, "object" before
+        "dtypes_ok": all(dtypes[c] == e or (e == "str" and dtypes[c] == "object") for c, e in EXPECTED.items()),
+        "read_csv_kb": round(raw.memory_usage(deep=True).sum() / 1024, 1),
+        "loaded_kb": round(df.memory_usage(deep=True).sum() / 1024, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dtypes and memory of a dataset loaded through the pandas agent loader.")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows of the generated students CSV (a multiple of 4)")
+    args = parser.parse_args()
+
+    report = run(args.rows)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["dtypes_ok"] else 1)
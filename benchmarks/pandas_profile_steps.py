@@ -0,0 +1,88 @@
+"""
+Dataframe profile of the pandas agent: intermediate steps (python tool calls), LLM calls and
+prompt characters per question with and without the precomputed profile in the prompt.
+
+Without the profile every question runs one piece of pandas code before the answer. With it, the
+fake model is scripted to answer from the profile, as the real model is asked to for the shape,
+dtype, null, value count and summary statistic questions below, so the step savings are an upper
+bound. The prompt characters the profile adds to every call are measured as they are.
+
+Run from the repository root:
+    python benchmarks/pandas_profile_steps.py --rows 400
+"""
+import argparse
+import contextlib
+import io
+import json
+
+import pandas as pd
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, count_react_steps, messages_to_text
+
+# question -> the pandas code that answers it without the profile
+QUESTIONS = {
+    "How many rows of data are in this file?": "len(df)",
+    "How many columns does the dataframe have?": "len(df.columns)",
+    "Which columns have missing values?": "df.columns[df.isna().any()].tolist()",
+    "What are the possible values of the school column?": "df['school'].unique().tolist()",
+    "How many students are female?": "(df['sex'] == 'F').sum()",
+    "What is the average age of the students?": "df['age'].mean()",
+    "What is the highest final grade G3?": "df['G3'].max()",
+    "What is the data type of the absences column?": "df['absences'].dtype",
+}
+PROFILE_MARKER = "Here is a precomputed profile of `df`"
+
+
+def _students_df(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "school": ["GP", "MS"] * (rows // 2),
+        "sex": ["F", "M", "F", "M"] * (rows // 4),
+        "age": [15, 16, 17, 19] * (rows // 4),
+        "absences": [0, 4, None, 2] * (rows // 4),
+        "G3": [10, 12, 14, 8] * (rows // 4),
+    })
+
+
+def _responder(messages, tools):
+    if count_react_steps(messages) >= 1 or PROFILE_MARKER in messages_to_text(messages):
+        return "Thought: I now know the final answer\nFinal Answer: the answer"
+    code = next(code for question, code in QUESTIONS.items() if question in messages_to_text(messages))
+    return f"Thought: I should look at df.\nAction: python_repl_ast\nAction Input: {code}"
+
+
+def run(module, df: pd.DataFrame, profile: bool) -> dict:
+    llm = FakeChatModel(responder=_responder)
+    agent = module.Agent(llm=llm, df=df, profile=profile)
+
+    steps, calls, prompt_chars = {}, 0, 0
+    for question in QUESTIONS:
+        llm.stats.reset()
+        # invoke() only returns the answer, the executor result holds the steps
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = agent.agent.invoke(question)
+        steps[question] = len(response["intermediate_steps"])
+        snapshot = llm.stats.snapshot()
+        calls += snapshot["llm_calls"]
+        prompt_chars += snapshot["prompt_chars"]
+
+    return {"steps": steps, "total_steps": sum(steps.values()), "llm_calls": calls, "prompt_chars": prompt_chars}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Steps per question of the pandas agent with and without the dataframe profile.")
+    parser.add_argument("--rows", type=int, default=400, help="Rows of the generated students dataframe (a multiple of 4)")
+    args = parser.parse_args()
+
+    module = load_agent_module("create_pandas_dataframe_agent")
+    df = _students_df(args.rows)
+    without_profile = run(module, df, profile=False)
+    with_profile = run(module, df, profile=True)
+
+    report = {
+        "questions": {q: {"without_profile": without_profile["steps"][q], "with_profile": with_profile["steps"][q]} for q in QUESTIONS},
+        "without_profile": {k: v for k, v in without_profile.items() if k != "steps"},
+        "with_profile": {k: v for k, v in with_profile.items() if k != "steps"},
+    }
+    report["steps_saved"] = without_profile["total_steps"] - with_profile["total_steps"]
+    print(json.dumps(report, indent=2))
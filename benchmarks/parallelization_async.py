@@ -0,0 +1,99 @@
+"""
+Async fan-out of the parallelization workflow: wall time of a set of translation requests run one
+after another with invoke() versus all at once on one event loop with ainvoke(), and the most LLM
+calls that were in flight at the same time, which max_concurrency caps.
+
+Run from the repository root:
+    python benchmarks/parallelization_async.py --requests 10 --languages 4 --latency-ms 100 --max-concurrency 8
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import threading
+import time
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, LatencyModel, ScriptedResponder
+
+LANGUAGES = ["French", "Spanish", "Japanese", "German", "Italian", "Portuguese", "Dutch", "Korean"]
+
+
+class InFlight:
+    """Wraps the responder to count the calls running at the same time."""
+
+    def __init__(self, responder: ScriptedResponder):
+        self.responder = responder
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages, tools):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        return self.responder(messages, tools)
+
+    def done(self):
+        with self._lock:
+            self.current -= 1
+
+
+class CountingChatModel(FakeChatModel):
+    """FakeChatModel that marks a call finished only after its latency, so overlapping calls are seen."""
+
+    async def _agenerate(self, *args, **kwargs):
+        try:
+            return await super()._agenerate(*args, **kwargs)
+        finally:
+            self.responder.done()
+
+    def _generate(self, *args, **kwargs):
+        try:
+            return super()._generate(*args, **kwargs)
+        finally:
+            self.responder.done()
+
+
+def run(requests: int, languages: int, max_concurrency: int, latency: LatencyModel) -> dict:
+    module = load_agent_module("multi_agent_workflows/parallelization")
+    inputs = [{"text": f"Good morning number {i}!"} for i in range(requests)]
+    report = {"requests": requests, "languages": languages, "max_concurrency": max_concurrency}
+
+    for mode in ("invoke_sequential", "ainvoke_gather"):
+        in_flight = InFlight(ScriptedResponder(default="Bonjour !"))
+        agent = module.Agent(
+            llm=CountingChatModel(responder=in_flight, latency=latency),
+            languages=LANGUAGES[:languages],
+            max_concurrency=max_concurrency
+        )
+        start = time.perf_counter()
+        # the agent prints every translation, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "invoke_sequential":
+                for input_text in inputs:
+                    agent.invoke(input_text)
+            else:
+                async def gather():
+                    return await asyncio.gather(*(agent.ainvoke(input_text) for input_text in inputs))
+                asyncio.run(gather())
+        report[mode] = {
+            "wall_ms": round((time.perf_counter() - start) * 1000, 3),
+            "llm_calls": agent.llm.calls,
+            "peak_llm_calls_in_flight": in_flight.peak,
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequential invoke() versus concurrent ainvoke() of the parallelization workflow.")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--languages", type=int, default=4, choices=range(1, len(LANGUAGES) + 1))
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Latency of one fake LLM call")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    latency = LatencyModel(mean_ms=args.latency_ms)
+    print(json.dumps(run(args.requests, args.languages, args.max_concurrency, latency), indent=2))
@@ -0,0 +1,15 @@
+import math
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile: the smallest value with at least q of the values at or below it,
+    so the p95 of 10 values is the largest one and the p95 of 2 values is never the smaller one.
+    """
+    if not values:
+        raise ValueError("percentile of no values")
+    ordered = sorted(values)
+    # rounded first, 0.07 * 100 is 7.000000000000001 in floating point
+    rank = math.ceil(round(q * len(ordered), 9))
+    return ordered[max(0, rank - 1)]
@@ -0,0 +1,88 @@
+"""
+Rounds, LLM calls and latency of the reflection_pattern workflow with one plan per round versus
+N candidate plans generated concurrently and graded in one batch.
+
+The fake generator gives every plan a random risk level and the fake evaluator grades a plan by
+that level, so a plan matches the "moderate" target one time in five.
+
+Run from the repository root:
+    python benchmarks/reflection_pattern_candidates.py --requests 50 --candidates 1 4 --latency-ms 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import threading
+import time
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, LatencyModel, ScriptedResponder, messages_to_text, tool_call
+from percentiles import percentile
+
+GRADES = ["ultra-conservative", "conservative", "moderate", "aggressive", "high risk"]
+TARGET_GRADE = "moderate"
+PROFILE = {"investor_profile": "Age: 29\nSalary: $110,000\nAssets: $40,000\nRisk tolerance: High"}
+
+
+class RandomPlans:
+    """Plans tagged with a random risk level, seeded so both modes see the same distribution."""
+
+    def __init__(self, seed: int):
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, messages, tools):
+        with self._lock:
+            return f"Plan [risk: {self._random.choice(GRADES)}]"
+
+
+def grade_plan(messages, tools):
+    text = messages_to_text(messages)
+    grade = text.split("[risk: ", 1)[1].split("]", 1)[0]
+    return tool_call("Feedback", {"grade": grade, "feedback": f"The plan is {grade}."})
+
+
+def run(requests: int, candidates: int, latency: LatencyModel, seed: int) -> dict:
+    module = load_agent_module("multi_agent_workflows/reflection_pattern")
+    responder = ScriptedResponder([
+        ("tool:Feedback", grade_plan),
+        ("choose exactly one risk classification", TARGET_GRADE),
+    ], default=RandomPlans(seed))
+    llm = FakeChatModel(responder=responder, latency=latency)
+    agent = module.Agent(llm=llm, candidates=candidates)
+
+    wall_ms, rounds, calls, matched = [], [], [], 0
+    for _ in range(requests):
+        llm.stats.reset()
+        start = time.perf_counter()
+        # the routing step prints every round, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = agent.invoke(dict(PROFILE))
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        rounds.append(state["n"])
+        calls.append(llm.stats.snapshot()["llm_calls"])
+        matched += state["grade"] == state["target_grade"]
+
+    return {
+        "candidates": candidates,
+        "requests": requests,
+        "matched_target": matched,
+        "rounds_mean": round(statistics.mean(rounds), 2),
+        "llm_calls_mean": round(statistics.mean(calls), 2),
+        "wall_ms_mean": round(statistics.mean(wall_ms), 3),
+        "wall_ms_p95": round(percentile(wall_ms, 0.95), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Candidate plans per round in the reflection_pattern workflow.")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of one fake LLM call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency = LatencyModel(distribution="constant", mean_ms=args.latency_ms)
+    print(json.dumps([run(args.requests, n, latency, args.seed) for n in args.candidates], indent=2))
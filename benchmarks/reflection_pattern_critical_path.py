@@ -0,0 +1,67 @@
+"""
+Critical-path latency of the reflection_pattern workflow now that the target grade and the first
+plan are generated in parallel.
+
+With a constant fake LLM latency, the old fully sequential graph took one latency per LLM call.
+The report compares that serial path with the measured wall time; the difference is the latency
+saved by overlapping the first-round steps (one LLM call per request).
+
+Run from the repository root:
+    python benchmarks/reflection_pattern_critical_path.py --requests 20 --latency-ms 200
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, LatencyModel, ScriptedResponder, tool_call
+
+PROFILE = {"investor_profile": "Age: 29\nSalary: $110,000\nAssets: $40,000\nRisk tolerance: High"}
+
+
+def run(requests: int, latency_ms: float, rounds: int) -> dict:
+    module = load_agent_module("multi_agent_workflows/reflection_pattern")
+    # the first plan is "Plan v1", every revision is "Plan v2"; the evaluator only accepts Plan v{rounds}
+    responder = ScriptedResponder([
+        (f"Plan v{rounds}", tool_call("Feedback", {"grade": "moderate", "feedback": "Balanced plan."})),
+        ("tool:Feedback", tool_call("Feedback", {"grade": "aggressive", "feedback": "Too risky."})),
+        ("choose exactly one risk classification", "moderate"),
+        ("Previous strategy grade", "Plan v2"),
+    ], default="Plan v1")
+    llm = FakeChatModel(responder=responder, latency=LatencyModel(distribution="constant", mean_ms=latency_ms))
+    agent = module.Agent(llm=llm)
+
+    wall_ms, calls = [], []
+    for _ in range(requests):
+        llm.stats.reset()
+        start = time.perf_counter()
+        # the routing step prints every round, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.invoke(dict(PROFILE))
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        calls.append(llm.stats.snapshot()["llm_calls"])
+
+    serial_ms = statistics.mean(calls) * latency_ms
+    parallel_ms = statistics.mean(wall_ms)
+    return {
+        "requests": requests,
+        "rounds": rounds,
+        "llm_calls_mean": statistics.mean(calls),
+        "serial_critical_path_ms": round(serial_ms, 3),
+        "measured_wall_ms_mean": round(parallel_ms, 3),
+        "saved_ms": round(serial_ms - parallel_ms, 3),
+        "saved_pct": round(100 * (serial_ms - parallel_ms) / serial_ms, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency saved by overlapping the first-round steps of reflection_pattern.")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Latency of one fake LLM call")
+    parser.add_argument("--rounds", type=int, nargs="+", choices=[1, 2], default=[1, 2], help="Rounds until the plan matches the target")
+    args = parser.parse_args()
+
+    print(json.dumps([run(args.requests, args.latency_ms, n) for n in args.rounds], indent=2))
@@ -0,0 +1,110 @@
+"""
+Throughput of one shared ReflectionAgent / ReflexionAgent instance serving many concurrent requests.
+
+Both agents keep their loop counters in the graph state and compile their graph once, so a single
+instance can run several requests at the same time. The script runs the same requests on one
+instance sequentially and then from a thread pool, checks every concurrent run made as many LLM
+calls as a sequential one, and reports requests per second.
+
+Run from the repository root:
+    python benchmarks/reflection_throughput.py --requests 32 --concurrency 8 --latency-ms 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, FakeSearchTool, LatencyModel, ScriptedResponder, tool_call
+
+# the reflexion agent builds a Tavily client only when no search tool is given, keep it offline anyway
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+REFLEXION_ANSWER = {
+    "answer": "Eggs and avocado, avoid sugary cereal.",
+    "reflection": {"missing": "Clinical evidence", "superfluous": "None"},
+    "search_queries": ["eggs blood sugar", "breakfast heart disease"]
+}
+
+WORKFLOWS = {
+    "reflection": (
+        "reflection_agent",
+        ScriptedResponder([
+            ("Here's the LinkedIn post draft", "Add a clear call to action."),
+        ], default="Landed a developer job at IBM! #career"),
+        lambda module, llm: module.ReflectionAgent(llm=llm),
+        lambda agent, i: agent.call({"messages": [HumanMessage(content=f"Write LinkedIn post #{i} about IBM")]}),
+        5, # 3 generations and 2 reflections
+    ),
+    "reflexion": (
+        "reflexion_agent",
+        ScriptedResponder([
+            ("tool:ReviseAnswer", tool_call("ReviseAnswer", {**REFLEXION_ANSWER, "references": ["https://example.com"]})),
+            ("tool:AnswerQuestion", tool_call("AnswerQuestion", REFLEXION_ANSWER)),
+        ]),
+        lambda module, llm: module.ReflexionAgent(
+            llm=llm,
+            search_tool=FakeSearchTool(),
+            trace_path=os.path.join(tempfile.gettempdir(), "reflexion_throughput_trace.jsonl")
+        ),
+        lambda agent, i: agent.invoke(f"Question #{i}: what breakfast should a pre-diabetic eat?"),
+        5, # 1 answer and 4 revisions
+    ),
+}
+
+
+def _timed(fn, requests: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    # the agents print their intermediate steps, keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        if concurrency == 1:
+            for i in range(requests):
+                fn(i)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(fn, range(requests)))
+    return time.perf_counter() - start
+
+
+def run(requests: int, concurrency: int, latency: LatencyModel) -> dict:
+    report = {}
+    for name, (agent_dir, responder, build, call, expected_calls) in WORKFLOWS.items():
+        module = load_agent_module(agent_dir)
+        llm = FakeChatModel(responder=responder, latency=latency)
+        agent = build(module, llm)
+        run_one = lambda i: call(agent, i)
+
+        sequential_s = _timed(run_one, requests, 1)
+
+        llm.stats.reset()
+        concurrent_s = _timed(run_one, requests, concurrency)
+        calls = llm.stats.snapshot()["llm_calls"]
+        if calls != requests * expected_calls:
+            raise AssertionError(f"{name}: {calls} LLM calls for {requests} concurrent requests, expected {requests * expected_calls}")
+
+        report[name] = {
+            "requests": requests,
+            "concurrency": concurrency,
+            "sequential_rps": round(requests / sequential_s, 2),
+            "concurrent_rps": round(requests / concurrent_s, 2),
+            "speedup": round(sequential_s / concurrent_s, 2),
+            "llm_calls_per_request": calls / requests,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent requests on one shared reflection agent instance.")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of one fake LLM call")
+    args = parser.parse_args()
+
+    latency = LatencyModel(distribution="constant", mean_ms=args.latency_ms)
+    print(json.dumps(run(args.requests, args.concurrency, latency), indent=2))
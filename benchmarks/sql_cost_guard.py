@@ -0,0 +1,80 @@
+"""
+Cost guard of the SQL agent: what the agent gets back for an unbounded SELECT *, a cross join and
+a runaway recursive query, run through SQLDatabase as it is and through AgentSQLDatabase with a
+CostGuard (EXPLAIN check, automatic LIMIT, statement timeout).
+
+Runs against a temporary SQLite file.
+
+Run from the repository root:
+    python benchmarks/sql_cost_guard.py --rows 200000 --timeout-ms 2000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from langchain_community.utilities.sql_database import SQLDatabase
+from sqlalchemy import create_engine, text
+
+from agent_loader import load_agent_module
+
+QUERIES = {
+    "select_star": "SELECT * FROM events",
+    "cross_join": "SELECT e.id, u.name FROM events e, users u",
+    "runaway": "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n",
+    "indexed_lookup": "SELECT * FROM events WHERE id = 42",
+}
+
+
+def _create_tables(uri: str, rows: int):
+    engine = create_engine(uri)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(50))"))
+        conn.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, user_id INTEGER, kind VARCHAR(20), amount INTEGER)"))
+        conn.execute(text(
+            "WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < 1000) "
+            "INSERT INTO users (id, name) SELECT i, 'user ' || i FROM s"
+        ))
+        conn.execute(text(
+            f"WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < {rows}) "
+            "INSERT INTO events (id, user_id, kind, amount) SELECT i, i % 1000 + 1, 'kind ' || (i % 7), i % 500 FROM s"
+        ))
+    engine.dispose()
+
+
+def _run(db, query: str, skip_runaway: bool) -> dict:
+    if skip_runaway:
+        return {"skipped": "runs until killed without a statement timeout"}
+    start = time.perf_counter()
+    result = db.run_no_throw(query)
+    return {
+        "ms": round((time.perf_counter() - start) * 1000, 3),
+        "chars_returned": len(result),
+        "result": result if len(result) <= 300 else result[:300] + "...",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN cost guard, automatic LIMIT and statement timeout of the SQL agent.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--max-cost", type=float, default=1e7)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    parser.add_argument("--timeout-ms", type=int, default=2000)
+    args = parser.parse_args()
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='cost_guard_bench_'), 'bench.db')}"
+    _create_tables(uri, args.rows)
+
+    module = load_agent_module("sql_agent")
+    plain = SQLDatabase(create_engine(uri))
+    guard = module.CostGuard(max_cost=args.max_cost, max_rows=args.max_rows, statement_timeout_ms=args.timeout_ms)
+    guarded = module.AgentSQLDatabase(create_engine(uri), cost_guard=guard)
+
+    report = {}
+    for name, query in QUERIES.items():
+        report[name] = {
+            "sqldatabase": _run(plain, query, skip_runaway=name == "runaway"),
+            "cost_guard": _run(guarded, query, skip_runaway=False),
+        }
+    print(json.dumps(report, indent=2))
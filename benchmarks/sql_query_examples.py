@@ -0,0 +1,139 @@
+"""
+Query example index of the SQL agent: LLM calls per answered question with and without the
+question -> SQL index, for a repeated question and paraphrases of it.
+
+Without the index every question goes through list tables -> query -> answer. With it, the first
+answer is recorded, the same question again runs the recorded SQL and needs one call to phrase the
+answer, and paraphrases get the recorded SQL as an example. The fake model is scripted to use an
+example when it is given one, as the real model is asked to, so the few-shot savings are an upper
+bound; the direct answers do not depend on the model.
+
+It also checks that near-duplicates that mean something else ("active" and "inactive", "shipped"
+and "not shipped") are never answered directly with the recorded SQL, even with a lower
+direct_answer_score, and exits non-zero when one is.
+
+Run from the repository root:
+    python benchmarks/sql_query_examples.py --rounds 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, ScriptedResponder, count_react_steps, messages_to_text
+
+# recorded question -> a near-duplicate that needs different SQL
+NEAR_DUPLICATES = {
+    "Which customers whose account status is active have placed more than three orders since the start of the year?":
+        "Which customers whose account status is inactive have placed more than three orders since the start of the year?",
+    "How many of the orders placed by returning customers through the web shop were shipped?":
+        "How many of the orders placed by returning customers through the web shop were not shipped?",
+    "How many orders were placed in 2024 by returning customers through the web shop?":
+        "How many orders were placed in 2023 by returning customers through the web shop?",
+}
+
+QUESTIONS = [
+    "How many processes have been registered so far?",
+    "How many processes have been registered so far?",
+    "how many processes were registered so far",
+    "How many processes are registered?",
+]
+
+
+def _with_example(messages, tools) -> bool:
+    return "Similar questions were answered before" in messages_to_text(messages)
+
+
+def _responder() -> ScriptedResponder:
+    return ScriptedResponder([
+        ("Answer the question using only the result", "3 processes have been registered so far."),
+        (lambda m, t: count_react_steps(m) >= 2 or (_with_example(m, t) and count_react_steps(m) >= 1),
+         "Thought: I now know the final answer\nFinal Answer: 3"),
+        (lambda m, t: count_react_steps(m) >= 1 or _with_example(m, t),
+         "Thought: I should count them.\nAction: sql_db_query\nAction Input: SELECT COUNT(*) FROM processes"),
+    ], default="Thought: I should look at the tables.\nAction: sql_db_list_tables\nAction Input: ")
+
+
+def _sqlite_db(folder: str) -> str:
+    path = os.path.join(folder, "processes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE processes (id INTEGER PRIMARY KEY, name TEXT, status TEXT)")
+    conn.executemany(
+        "INSERT INTO processes (name, status) VALUES (?, ?)",
+        [("onboarding", "open"), ("billing", "closed"), ("audit", "open")]
+    )
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+def run(module, rounds: int, use_index: bool) -> dict:
+    folder = tempfile.mkdtemp(prefix="query_examples_bench_")
+    llm = FakeChatModel(responder=_responder())
+    index = module.QueryExampleIndex(os.path.join(folder, "query_examples.sqlite3")) if use_index else False
+    agent = module.Agent(llm=llm, db_uri=_sqlite_db(folder), query_examples=index)
+
+    calls = []
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            before = llm.calls
+            # the executor is verbose, only the counts are reported
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent.invoke(question)
+            calls.append(llm.calls - before)
+
+    report = {
+        "questions": len(calls),
+        "llm_calls": sum(calls),
+        "llm_calls_per_question": round(sum(calls) / len(calls), 3),
+        "llm_calls_first_round": calls[:len(QUESTIONS)],
+    }
+    if use_index:
+        report["index"] = index.stats()
+    return report
+
+
+def check_near_duplicates(module) -> dict:
+    folder = tempfile.mkdtemp(prefix="query_examples_bench_")
+    index = module.QueryExampleIndex(os.path.join(folder, "query_examples.sqlite3"))
+    # a threshold below every score here, so only the word and literal check keeps them apart
+    agent = module.Agent(llm=FakeChatModel(responder=_responder()), db_uri=_sqlite_db(folder), query_examples=index,
+                         direct_answer_score=0.8)
+
+    report = {}
+    for recorded, near_duplicate in NEAR_DUPLICATES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.invoke(recorded)
+            score = index.search(near_duplicate, k=1, namespace=agent.examples_namespace)[0][0]
+            direct_before = index.stats()["direct"]
+            agent.invoke(near_duplicate)
+        report[near_duplicate] = {"score": score, "answered_directly": index.stats()["direct"] > direct_before}
+
+    # the same question again must still be answered directly
+    with contextlib.redirect_stdout(io.StringIO()):
+        direct_before = index.stats()["direct"]
+        agent.invoke(next(iter(NEAR_DUPLICATES)).upper())
+    report["same question again, upper case"] = {"answered_directly": index.stats()["direct"] > direct_before}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM calls per question with and without the SQL agent query example index.")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    module = load_agent_module("sql_agent")
+    near_duplicates = check_near_duplicates(module)
+    print(json.dumps({
+        "without_index": run(module, args.rounds, use_index=False),
+        "with_index": run(module, args.rounds, use_index=True),
+        "near_duplicates": near_duplicates,
+    }, indent=2))
+
+    same = near_duplicates.pop("same question again, upper case")["answered_directly"]
+    sys.exit(0 if same and not any(check["answered_directly"] for check in near_duplicates.values()) else 1)
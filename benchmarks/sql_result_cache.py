@@ -0,0 +1,77 @@
+"""
+Result cache of the SQL agent database: latency of repeated read-only queries with and without
+QueryResultCache, invalidation after a write, and rejection of writes in read-only mode.
+
+Run from the repository root:
+    python benchmarks/sql_result_cache.py --rows 200000 --repeats 20
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from agent_loader import load_agent_module
+
+QUERIES = [
+    "SELECT COUNT(*) FROM processes",
+    "select count(*)\n  from PROCESSES;",
+    "SELECT status, COUNT(*) FROM processes GROUP BY status",
+]
+
+
+def _sqlite_db(rows: int) -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="result_cache_bench_"), "processes.db")
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE processes (id INTEGER PRIMARY KEY, status TEXT, amount INTEGER)"))
+        conn.execute(
+            text("INSERT INTO processes (status, amount) VALUES (:status, :amount)"),
+            [{"status": ["open", "closed", "pending"][i % 3], "amount": i % 100} for i in range(rows)]
+        )
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+def _mean_ms(db, repeats: int) -> float:
+    latencies = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            start = time.perf_counter()
+            db.run_no_throw(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return round(statistics.mean(latencies), 3)
+
+
+def run(rows: int, repeats: int) -> dict:
+    module = load_agent_module("sql_agent")
+    uri = _sqlite_db(rows)
+
+    uncached = module.AgentSQLDatabase.from_uri(uri)
+    cached = module.AgentSQLDatabase.from_uri(uri, result_cache=module.QueryResultCache(ttl_seconds=60))
+    writable = module.AgentSQLDatabase.from_uri(uri, read_only=False, result_cache=cached.result_cache)
+
+    report = {
+        "rows": rows,
+        "uncached_ms_per_query": _mean_ms(uncached, repeats),
+        "cached_ms_per_query": _mean_ms(cached, repeats),
+        "cache": cached.result_cache.stats(),
+        "write_in_read_only_mode": cached.run_no_throw("DELETE FROM processes WHERE id = 1"),
+    }
+
+    before = cached.run_no_throw(QUERIES[0])
+    writable.run_no_throw("DELETE FROM processes WHERE id = 1")
+    report["count_refreshed_after_write"] = cached.run_no_throw(QUERIES[0]) != before
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Result cache of the SQL agent database.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.repeats), indent=2))
@@ -0,0 +1,111 @@
+"""
+Result export of the SQL agent: time, peak Python memory and characters handed to the agent for a
+SELECT * over a large table, formatted into the tool result by SQLDatabase versus streamed to a
+file by AgentSQLDatabase with a ResultExporter (only a preview goes to the agent).
+
+It also checks the automatic LIMIT of the cost guard: a query run as usual gets max_rows, only a
+query sent to export (the sql_db_export tool) gets export_max_rows. The script exits non-zero when
+that check fails.
+
+Runs against a temporary SQLite file, and against Postgres too when BENCH_POSTGRES_URI points to a
+scratch database (a table named bench_export_events is created and dropped there), where the
+export reads through a server-side cursor.
+
+Run from the repository root:
+    python benchmarks/sql_result_export.py --rows 1000000 --format parquet
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from langchain_community.utilities.sql_database import SQLDatabase
+from sqlalchemy import create_engine, text
+
+from agent_loader import load_agent_module
+
+TABLE = "bench_export_events"
+QUERY = f"SELECT * FROM {TABLE}"
+
+
+def _create_table(engine, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, kind VARCHAR(20), amount INTEGER, note VARCHAR(50))"))
+        conn.execute(text(
+            f"WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < {rows}) "
+            f"INSERT INTO {TABLE} (id, kind, amount, note) SELECT i, 'kind ' || (i % 7), i % 500, 'note ' || i FROM s"
+        ))
+
+
+def _measure(db) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = db.run_no_throw(QUERY)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_python_mb": round(peak / 1024 / 1024, 1),
+        "chars_to_agent": len(result),
+    }
+
+
+def _result_rows(result: str) -> int:
+    exported = re.match(r"The result has ([\d,]+) rows", result)
+    return int(exported.group(1).replace(",", "")) if exported else len(ast.literal_eval(result or "[]"))
+
+
+def check_limits(module, engine, rows: int, directory: str) -> dict:
+    guard = module.CostGuard(max_cost=None, max_rows=300, export_max_rows=600, statement_timeout_ms=None)
+    db = module.AgentSQLDatabase(engine, result_exporter=module.ResultExporter(directory=directory), cost_guard=guard)
+    query_rows = _result_rows(db.run_no_throw(QUERY))
+    export_rows = _result_rows(db.export_no_throw(QUERY))
+    return {
+        "query_rows": query_rows,
+        "export_rows": export_rows,
+        "ok": query_rows == min(rows, guard.max_rows) and export_rows == min(rows, guard.export_max_rows),
+    }
+
+
+def run_backend(uri: str, rows: int, file_format: str) -> dict:
+    module = load_agent_module("sql_agent")
+    engine = create_engine(uri)
+    _create_table(engine, rows)
+    try:
+        exporter = module.ResultExporter(directory=tempfile.mkdtemp(prefix="result_export_bench_"), file_format=file_format)
+        exported = module.AgentSQLDatabase(engine, result_exporter=exporter)
+        report = {
+            "rows": rows,
+            "sqldatabase": _measure(SQLDatabase(engine)),
+            "exported": _measure(exported),
+        }
+        report["exported"].update(exporter.stats())
+        report["preview"] = exported.run_no_throw(QUERY)
+        report["limits"] = check_limits(module, engine, rows, exporter.directory)
+        return report
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Large SQL results in the tool result versus streamed to a file.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    args = parser.parse_args()
+
+    backends = {"sqlite": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='result_export_bench_'), 'bench.db')}"}
+    if os.environ.get("BENCH_POSTGRES_URI"):
+        backends["postgresql"] = os.environ["BENCH_POSTGRES_URI"]
+
+    report = {name: run_backend(uri, args.rows, args.format) for name, uri in backends.items()}
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if all(backend["limits"]["ok"] for backend in report.values()) else 1)
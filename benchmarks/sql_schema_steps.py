@@ -0,0 +1,101 @@
+"""
+Schema catalog of the SQL agent: intermediate steps (tool calls), LLM calls and prompt characters
+per question with and without the catalog in the prompt.
+
+Without the catalog the fake model explores first (sql_db_list_tables, then sql_db_schema when it
+needs columns) before querying or answering. With it, the model is scripted to skip that
+exploration, as the real model is asked to, so the step savings are an upper bound. The prompt
+characters the catalog adds to every call are measured as they are.
+
+Runs against a temporary SQLite file unless --db-uri points to another database (a local Postgres
+for example) with a processes table.
+
+Run from the repository root:
+    python benchmarks/sql_schema_steps.py
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+
+from agent_loader import load_agent_module
+from fake_llm import FakeChatModel, count_react_steps, messages_to_text
+
+LIST_TABLES = ("sql_db_list_tables", "")
+SCHEMA = ("sql_db_schema", "processes")
+# question -> the tool calls the model makes without the catalog, the exploration ones are skipped with it
+QUESTIONS = {
+    "How many tables are there?": [LIST_TABLES],
+    "What are the names of the tables?": [LIST_TABLES],
+    "Which columns does the processes table have?": [LIST_TABLES, SCHEMA],
+    "How many processes have been registered so far?": [LIST_TABLES, ("sql_db_query", "SELECT COUNT(*) FROM processes")],
+}
+EXPLORATION = {LIST_TABLES[0], SCHEMA[0]}
+SCHEMA_MARKER = "This is the current database schema"
+
+
+def _responder(messages, tools):
+    text = messages_to_text(messages)
+    plan = next(plan for question, plan in QUESTIONS.items() if question in text)
+    if SCHEMA_MARKER in text:
+        plan = [step for step in plan if step[0] not in EXPLORATION]
+
+    done = count_react_steps(messages)
+    if done >= len(plan):
+        return "Thought: I now know the final answer\nFinal Answer: the answer"
+    tool, tool_input = plan[done]
+    return f"Thought: I should use {tool}.\nAction: {tool}\nAction Input: {tool_input}"
+
+
+def _sqlite_db() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="schema_steps_bench_"), "processes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE processes (id INTEGER PRIMARY KEY, name TEXT, status TEXT)")
+    conn.executemany(
+        "INSERT INTO processes (name, status) VALUES (?, ?)",
+        [("onboarding", "open"), ("billing", "closed"), ("audit", "open")]
+    )
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+def run(module, db_uri: str, schema_in_prompt: bool) -> dict:
+    llm = FakeChatModel(responder=_responder)
+    # without the query example index, otherwise the second run reuses the answers of the first
+    agent = module.Agent(llm=llm, db_uri=db_uri, schema_in_prompt=schema_in_prompt, query_examples=False)
+
+    steps, calls, prompt_chars = {}, 0, 0
+    for question in QUESTIONS:
+        llm.stats.reset()
+        # the executor is verbose, only the counts are reported
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = agent.invoke(question)
+        steps[question] = len(response["intermediate_steps"])
+        snapshot = llm.stats.snapshot()
+        calls += snapshot["llm_calls"]
+        prompt_chars += snapshot["prompt_chars"]
+
+    return {"steps": steps, "total_steps": sum(steps.values()), "llm_calls": calls, "prompt_chars": prompt_chars}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Steps per question of the SQL agent with and without the schema catalog in the prompt.")
+    parser.add_argument("--db-uri", help="Database with a processes table (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    module = load_agent_module("sql_agent")
+    db_uri = args.db_uri or _sqlite_db()
+    without_schema = run(module, db_uri, schema_in_prompt=False)
+    with_schema = run(module, db_uri, schema_in_prompt=True)
+
+    report = {
+        "questions": {q: {"without_schema": without_schema["steps"][q], "with_schema": with_schema["steps"][q]} for q in QUESTIONS},
+        "without_schema": {k: v for k, v in without_schema.items() if k != "steps"},
+        "with_schema": {k: v for k, v in with_schema.items() if k != "steps"},
+    }
+    report["steps_saved"] = without_schema["total_steps"] - with_schema["total_steps"]
+    print(json.dumps(report, indent=2))
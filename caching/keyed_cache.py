@@ -0,0 +1,52 @@
+"""
+In-memory LRU + TTL cache of values keyed by a normalized form of the caller's key.
+
+The agent-level caches build on it: reflexion_agent/search_cache.py (search results by query)
+and multi_agent_workflows/orchestrator_worker/dish_cache.py (chef guides by dish).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class KeyedTTLCache:
+    """
+    Values keyed by key_fn(key), so keys that normalize the same share an entry.
+
+    One instance can be shared by several agents and threads. Entries are evicted least recently
+    used first once there are more than max_entries and expire after ttl_seconds (None: never).
+    """
+
+    def __init__(self, key_fn: Callable[[Any], Hashable], max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.key_fn = key_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict() # normalized key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        key = self.key_fn(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (self.ttl_seconds is None or time.monotonic() - entry[0] < self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key: Any, value: Any):
+        key = self.key_fn(key)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
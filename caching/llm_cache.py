@@ -0,0 +1,169 @@
+"""
+Persistent LLM response cache shared by every agent.
+
+TieredLLMCache plugs into LangChain's cache hook, so ChatCohere consults it before calling the
+API. Entries are keyed by a hash of the serialized prompt messages and the model string (model
+name, temperature, bound tools and other call parameters). The in-memory LRU tier is checked
+first, then the SQLite tier. Calls that do not run at temperature 0 are not cached unless
+allow_nonzero_temperature is set, because their answers are not meant to repeat.
+
+Install it for every agent in the process:
+    from caching.llm_cache import install_llm_cache
+    install_llm_cache("llm_cache.sqlite3", ttl_seconds=24 * 3600)
+
+Every agent takes a cache argument that it passes to its chat model: None (the default) uses the
+cache installed for the process, Agent(cache=False) opts the agent out, and
+Agent(cache=TieredLLMCache(...)) gives it its own cache.
+"""
+import ast
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+# matches "temperature": 0.3 in serialized models and ('temperature', 0.3) in parameter strings
+TEMPERATURE_PATTERN = re.compile(r"""temperature['"]?\s*[:,]\s*(None|null|-?\d+(?:\.\d+)?)""")
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    # the prompt is keyed as it is: whitespace can matter (code, tables, indentation-sensitive input)
+    return hashlib.sha256(f"{prompt}\x00{llm_string}".encode("utf-8")).hexdigest()
+
+
+def _params_temperature(params: str) -> Optional[float]:
+    """Temperature in a call parameter string like [('stop', None), ('temperature', 0.7)]."""
+    try:
+        value = dict(ast.literal_eval(params)).get("temperature")
+    except (ValueError, SyntaxError, TypeError):
+        # not a literal (e.g. the repr of a bound tool object), the last match is the value set last
+        matches = TEMPERATURE_PATTERN.findall(params)
+        value = matches[-1] if matches and matches[-1] not in ("None", "null") else None
+    return None if value is None else float(value)
+
+
+def effective_temperature(llm_string: str) -> Optional[float]:
+    """
+    The temperature a call really runs at, None for the provider default.
+
+    Serializable models give "<model JSON>---<call params>", the others only the call params. The
+    call params (.bind(), invoke() keyword arguments) override the temperature field of the model,
+    so model(temperature=0).bind(temperature=0.7) runs at 0.7.
+    """
+    try:
+        model, end = json.JSONDecoder().raw_decode(llm_string)
+    except ValueError:
+        return _params_temperature(llm_string)
+
+    temperature = _params_temperature(llm_string[end:].removeprefix("---"))
+    if temperature is None and isinstance(model, dict):
+        temperature = model.get("kwargs", {}).get("temperature")
+    return None if temperature is None else float(temperature)
+
+
+def is_deterministic(llm_string: str) -> bool:
+    """True when the call runs at temperature 0. A missing temperature means the provider default."""
+    return effective_temperature(llm_string) == 0
+
+
+class TieredLLMCache(BaseCache):
+    def __init__(
+        self,
+        path: Optional[str] = "llm_cache.sqlite3",
+        max_memory_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        allow_nonzero_temperature: bool = False
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.allow_nonzero_temperature = allow_nonzero_temperature
+        self.stats = {"memory_hits": 0, "sqlite_hits": 0, "misses": 0, "not_cacheable": 0}
+
+        self._memory = OrderedDict() # key -> (stored_at, generations)
+        self._lock = threading.Lock()
+
+        # path=None keeps only the in-memory tier
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, generations TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _cacheable(self, llm_string: str) -> bool:
+        return self.allow_nonzero_temperature or is_deterministic(llm_string)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, generations: Sequence[Generation]):
+        # caller holds the lock
+        self._memory[key] = (stored_at, generations)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if not self._cacheable(llm_string):
+            with self._lock:
+                self.stats["not_cacheable"] += 1
+            return None
+
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT generations, stored_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and not self._expired(row[1]):
+                    generations = [loads(g) for g in json.loads(row[0])]
+                    self._remember(key, row[1], generations)
+                    self.stats["sqlite_hits"] += 1
+                    return generations
+
+            self.stats["misses"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if not self._cacheable(llm_string):
+            return
+
+        key = cache_key(prompt, llm_string)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, return_val)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, generations, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps([dumps(g) for g in return_val]), stored_at)
+                )
+                self._conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+
+def install_llm_cache(path: Optional[str] = "llm_cache.sqlite3", **kwargs) -> TieredLLMCache:
+    """Make a TieredLLMCache the global LangChain cache, used by every agent that does not opt out."""
+    cache = TieredLLMCache(path, **kwargs)
+    set_llm_cache(cache)
+    return cache
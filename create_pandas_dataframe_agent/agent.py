@@ -1,31 +1,58 @@
 from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
+from langchain_experimental.agents.agent_toolkits.pandas.prompt import PREFIX
 from langchain_cohere.chat_models import ChatCohere
 import matplotlib.pyplot as plt
 import pandas as pd
 import os
 from dotenv import load_dotenv
 
+from dataset_loader import DEFAULT_DATASET, load_dataset
+from df_profile import profile_cache
+from sandbox import SandboxPool, SandboxedPythonTool
+
 
 load_dotenv()
 
 class Agent:
-    def __init__(self):
-        df = pd.read_csv(
-            "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-        )
+    def __init__(self, llm=None, cache=None, df: pd.DataFrame = None, dataset: str = DEFAULT_DATASET, profile: bool = True,
+                 sandbox: bool = False, sandbox_options: dict = None):
+        if df is None:
+            # downloaded and converted once, later starts memory-map the local columnar copy
+            df = load_dataset(dataset)
 
-        llm = ChatCohere(
+        llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
+        prefix = PREFIX
+        if profile:
+            # the profile answers shape/dtype/null questions without a round trip through the python tool.
+            # It is built once per dataframe version, braces are escaped for the prompt template
+            df_profile = profile_cache.get(df).replace("{", "{{").replace("}", "}}")
+            prefix = (
+                f"Here is a precomputed profile of `df`. Use it directly when it answers the question, "
+                f"and only run code for what it does not cover:\n{df_profile}\n\n{PREFIX}"
+            )
+
         self.agent = create_pandas_dataframe_agent(
             llm=llm,
             df=df,
+            prefix=prefix,
             verbose=False,
+            allow_dangerous_code=True,  # the agent runs the pandas code it writes, required by langchain-experimental 0.3
             return_intermediate_steps=True  # set return_intermediate_steps=True so that model could return code that it comes up with to generate the chart
         )
 
+        self.sandbox = None
+        if sandbox:
+            # run the generated code on warm worker processes with timeouts and limits instead of in this process.
+            # sandbox_options are passed to SandboxPool (workers, wall_timeout, cpu_seconds, memory_bytes, ...)
+            self.sandbox = SandboxPool(df, **(sandbox_options or {}))
+            sandboxed_tool = SandboxedPythonTool(pool=self.sandbox)
+            self.agent.tools = [sandboxed_tool if t.name == sandboxed_tool.name else t for t in self.agent.tools]
+
     def invoke(self, query: str) -> str:
         response = self.agent.invoke(query)
         final_answer = response["output"]
@@ -0,0 +1,114 @@
+import argparse
+import hashlib
+import os
+import resource
+import time
+import urllib.request
+
+import pandas as pd
+import pyarrow.feather as feather
+
+DEFAULT_DATASET = "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
+DEFAULT_CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dataset_cache"))
+
+# string columns with fewer distinct values than this share of the rows become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _is_text(series: pd.Series) -> bool:
+    # read_csv gives object columns on older pandas and the string dtype on pandas 3
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """Smallest dtypes that hold the data: categoricals for repetitive strings, small ints and floats."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="float")
+        elif _is_text(series) and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * max(len(series), 1):
+            df[column] = series.astype("category")
+    return df
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://", "s3://"))
+
+
+def _cache_path(source: str, cache_dir: str) -> str:
+    # a local file gets a new cache entry when it changes
+    key = source if _is_url(source) else f"{os.path.abspath(source)}:{os.path.getmtime(source)}:{os.path.getsize(source)}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.feather")
+
+
+def _read_source(source: str, cache_dir: str) -> pd.DataFrame:
+    if _is_url(source):
+        # download once next to the cache, then parse the local copy
+        raw_path = os.path.join(cache_dir, os.path.basename(source.split("?", 1)[0]) or "dataset.csv")
+        urllib.request.urlretrieve(source, raw_path + ".part")
+        os.replace(raw_path + ".part", raw_path)
+        source = raw_path
+    if source.endswith(".parquet"):
+        return pd.read_parquet(source)
+    return pd.read_csv(source)
+
+
+def load_dataset(source: str = DEFAULT_DATASET, cache_dir: str = DEFAULT_CACHE_DIR, refresh: bool = False) -> pd.DataFrame:
+    """
+    Load a CSV (URL or local path) through a typed Feather copy kept in cache_dir.
+
+    The first load downloads and parses the source, downcasts the dtypes and writes an
+    uncompressed Feather file. Later loads memory-map that file, so numeric columns are read
+    straight from the page cache instead of being parsed again. Local .feather files are
+    memory-mapped directly.
+    """
+    if source.endswith(".feather"):
+        return feather.read_table(source, memory_map=True).to_pandas(split_blocks=True)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(source, cache_dir)
+
+    if refresh or not os.path.exists(path):
+        df = downcast(_read_source(source, cache_dir))
+        # written to a temporary name first, a concurrent start never sees a half written file
+        feather.write_feather(df, path + ".tmp", compression="uncompressed")
+        os.replace(path + ".tmp", path)
+
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        # peak instead of current resident memory where /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+if __name__ == "__main__":
+    # report the startup cost of the dataset from the create_pandas_dataframe_agent folder:
+    #   python dataset_loader.py            (second run reads the cached copy)
+    #   python dataset_loader.py --refresh  (download and convert again)
+    parser = argparse.ArgumentParser(description="Load the agent dataset through the local columnar cache.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_DATASET)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--refresh", action="store_true")
+    args = parser.parse_args()
+
+    rss_before = _rss_kb()
+    start = time.perf_counter()
+    df = load_dataset(args.source, args.cache_dir, refresh=args.refresh)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"rows: {len(df)}, columns: {len(df.columns)}")
+    print(f"load time: {elapsed_ms:.1f} ms")
+    print(f"dataframe memory: {df.memory_usage(deep=True).sum() / 1024:.1f} KB")
+    rss_after = _rss_kb()
+    print(f"resident memory: {rss_after} KB (+{rss_after - rss_before} KB for the load)")
@@ -0,0 +1,63 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# columns with at most this many distinct values get their value counts in the profile
+MAX_VALUE_COUNTS = 10
+
+
+def dataframe_version(df: pd.DataFrame) -> str:
+    """Content hash of the dataframe: a new version whenever a value, a column or a dtype changes."""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def build_profile(df: pd.DataFrame) -> str:
+    """Plain-text summary of the dataframe: shape, dtypes, nulls, cardinalities, value counts and numeric stats."""
+    nulls = df.isna().sum()
+    distinct = df.nunique(dropna=True)
+    numeric = df.select_dtypes("number")
+    stats = numeric.describe().T if not numeric.empty else pd.DataFrame()
+
+    lines = [f"rows: {len(df)}, columns: {len(df.columns)}", "columns:"]
+    for column in df.columns:
+        line = f"- {column} ({df[column].dtype}): nulls {nulls[column]}, distinct {distinct[column]}"
+        if column in stats.index:
+            s = stats.loc[column]
+            line += f", min {s['min']:g}, max {s['max']:g}, mean {s['mean']:.3g}, std {s['std']:.3g}, median {s['50%']:g}"
+        if distinct[column] <= MAX_VALUE_COUNTS:
+            counts = df[column].value_counts(dropna=True)
+            line += ", values " + ", ".join(f"{value}: {count}" for value, count in counts.items())
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class ProfileCache:
+    """Profiles keyed by dataframe version, so a dataframe is only profiled once."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # version -> profile text
+        self._lock = threading.Lock()
+
+    def get(self, df: pd.DataFrame) -> str:
+        version = dataframe_version(df)
+        with self._lock:
+            if version in self._entries:
+                self._entries.move_to_end(version)
+                return self._entries[version]
+
+        profile = build_profile(df)
+        with self._lock:
+            self._entries[version] = profile
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+
+# shared by every agent in the process
+profile_cache = ProfileCache()
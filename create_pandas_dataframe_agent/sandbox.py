@@ -0,0 +1,232 @@
+"""
+Warm process pool that runs the pandas code written by the agent outside the server process.
+
+Workers are forked from the process that already holds the dataframe, so each worker starts with
+it loaded and shares its pages copy-on-write; pandas copy-on-write mode keeps the code of one call
+from changing the frame seen by the next one. Every call gets a wall timeout (the worker is killed
+and replaced), a CPU time limit (RLIMIT_CPU) and a memory cap (RLIMIT_AS), and workers are
+recycled after max_calls_per_worker calls, so one bad query cannot stall the other users.
+"""
+import ast
+import atexit
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import threading
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Optional
+
+import pandas as pd
+from langchain_core.tools import BaseTool
+from langchain_experimental.tools.python.tool import sanitize_input
+from pydantic import ConfigDict
+
+
+class CpuTimeExceeded(Exception):
+    pass
+
+
+def _cpu_time_exceeded(signum, frame):
+    raise CpuTimeExceeded()
+
+
+def _mapped_bytes() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _run_code(code: str, df: pd.DataFrame) -> str:
+    """Same semantics as PythonAstREPLTool: run the statements, return the value of the last expression or the prints."""
+    # a shallow copy per call, with copy-on-write any change stays local to this call
+    local_vars = {"df": df.copy(deep=False)}
+    tree = ast.parse(code)
+    head = ast.unparse(ast.Module(tree.body[:-1], type_ignores=[]))
+    last = ast.unparse(ast.Module(tree.body[-1:], type_ignores=[]))
+
+    output = StringIO()
+    with redirect_stdout(output):
+        exec(head, {}, local_vars)
+        try:
+            value = eval(last, {}, local_vars)
+        except SyntaxError:
+            # the last statement is not an expression
+            exec(last, {}, local_vars)
+            value = None
+    return output.getvalue() if value is None else str(value)
+
+
+def _worker_main(conn, df: pd.DataFrame, cpu_seconds: Optional[int], memory_bytes: Optional[int]):
+    # plots are rendered off screen, a plotting call never opens a window. MPLBACKEND would be read
+    # too late, a forked worker inherits matplotlib already imported by the parent, so the backend
+    # is switched here, before the memory cap
+    import matplotlib.pyplot as plt
+    plt.switch_backend("Agg")
+    pd.set_option("mode.copy_on_write", True)
+
+    if memory_bytes:
+        # the cap is on top of what the worker already maps (the interpreter, pandas and the shared frame)
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = _mapped_bytes() + memory_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (limit if hard == resource.RLIM_INFINITY else min(limit, hard), hard))
+
+    signal.signal(signal.SIGXCPU, _cpu_time_exceeded)
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:
+            break
+
+        if cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            resource.setrlimit(resource.RLIMIT_CPU, (int(usage.ru_utime + usage.ru_stime) + cpu_seconds, cpu_hard))
+        try:
+            result = _run_code(code, df)
+        except CpuTimeExceeded:
+            result = f"Error: the code used more than {cpu_seconds}s of CPU time"
+        except MemoryError:
+            result = "Error: the code went over the memory limit"
+        except Exception as e:
+            result = "{}: {}".format(type(e).__name__, str(e))
+        finally:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_hard, cpu_hard))
+
+        conn.send(result)
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.calls = 0
+
+
+class SandboxPool:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        workers: int = 2,
+        wall_timeout: float = 30.0,
+        cpu_seconds: Optional[int] = 20,
+        memory_bytes: Optional[int] = 1024 * 1024 * 1024,
+        max_calls_per_worker: int = 200,
+        max_output_chars: int = 20000
+    ):
+        self.df = df
+        self.wall_timeout = wall_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_calls_per_worker = max_calls_per_worker
+        self.max_output_chars = max_output_chars
+        self.stats = {"calls": 0, "timeouts": 0, "crashes": 0, "recycled": 0, "spawn_failures": 0}
+
+        # fork keeps the frame already loaded in this process, no pickling and shared pages
+        self._context = multiprocessing.get_context("fork")
+        self._lock = threading.Lock()
+        # one entry per slot: an idle worker, or None for a slot whose worker could not be started
+        self._idle = queue.Queue()
+        self._workers = []
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.df, self.cpu_seconds, self.memory_bytes),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _try_spawn(self) -> Optional[_Worker]:
+        try:
+            return self._spawn()
+        except OSError as e:
+            # fork can fail (EAGAIN, ENOMEM), the slot stays and the next call on it tries again
+            print(f"sandbox worker could not be started: {e}")
+            with self._lock:
+                self.stats["spawn_failures"] += 1
+            return None
+
+    def _replace(self, worker: _Worker, stat: str) -> Optional[_Worker]:
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        with self._lock:
+            self._workers.remove(worker)
+            self.stats[stat] += 1
+        return self._try_spawn()
+
+    def run(self, code: str) -> str:
+        # waits here while every slot is busy
+        worker = self._idle.get()
+        with self._lock:
+            self.stats["calls"] += 1
+        try:
+            if worker is None:
+                worker = self._try_spawn()
+                if worker is None:
+                    return "Error: the execution process could not be started, please retry"
+            try:
+                worker.conn.send(code)
+            except OSError:
+                # the worker died between two calls
+                worker = self._replace(worker, "crashes")
+                return "Error: the execution process was not available, please retry"
+            if not worker.conn.poll(self.wall_timeout):
+                worker = self._replace(worker, "timeouts")
+                return f"Error: the code did not finish within {self.wall_timeout}s"
+            try:
+                result = worker.conn.recv()
+            except EOFError:
+                # killed by the kernel or a hard limit
+                worker = self._replace(worker, "crashes")
+                return "Error: the code crashed the execution process"
+
+            worker.calls += 1
+            if worker.calls >= self.max_calls_per_worker:
+                worker = self._replace(worker, "recycled")
+
+            if len(result) > self.max_output_chars:
+                result = result[:self.max_output_chars] + "\n... output truncated"
+            return result
+        finally:
+            # the slot always goes back, with None when its replacement could not be started
+            self._idle.put(worker)
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.process.kill()
+            worker.process.join()
+            worker.conn.close()
+
+
+class SandboxedPythonTool(BaseTool):
+    """Drop-in replacement of the agent's python_repl_ast tool that runs the code on a SandboxPool."""
+
+    name: str = "python_repl_ast"
+    description: str = (
+        "A Python shell. Use this to execute python commands. "
+        "Input should be a valid python command. "
+        "When using this tool, sometimes output is abbreviated - "
+        "make sure it does not look abbreviated before using it in your answer."
+    )
+    pool: SandboxPool
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def _run(self, query: str, run_manager=None) -> str:
+        return self.pool.run(sanitize_input(query))
@@ -21,10 +21,11 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     
 class ClothingRecommendationAgent():
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
         tools = [search_tool, recommend_clothing]
@@ -45,6 +46,9 @@ class ClothingRecommendationAgent():
             ])
         
         self.model_react = self.chat_prompt | self.llm.bind_tools(tools)
+
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
     
     def _tool_node(self, state: AgentState):
         """Execute all tool calls from the last message in the state."""
@@ -77,7 +81,7 @@ class ClothingRecommendationAgent():
         response = self.model_react.invoke({"scratch_pad": state["messages"]})
         return {"messages": [response]}
     
-    def invoke(self, input):
+    def _build_graph(self):
         # Define a new graph
         workflow = StateGraph(AgentState)
 
@@ -102,8 +106,14 @@ class ClothingRecommendationAgent():
         workflow.set_entry_point("agent")
 
         # Compile the graph
-        graph = workflow.compile()
+        return workflow.compile()
+
+    def invoke(self, input):
+        responses = self.graph.invoke(input=input)
+
+        return responses["messages"][-1].content
 
-        responses = graph.invoke(input=input)
+    async def abatch(self, inputs):
+        responses = await self.graph.abatch(inputs, return_exceptions=True)
 
-        return responses["messages"][-1].content
\ No newline at end of file
+        return [response if isinstance(response, Exception) else response["messages"][-1].content for response in responses]
\ No newline at end of file
@@ -13,10 +13,11 @@ from tools.subtract_numbers_tool import subtract_numbers
 load_dotenv()
 
 class Agent:
-    def __init__(self):
+    def __init__(self, cache=None):
         llm = ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
         self.agent = create_react_agent(
@@ -10,10 +10,14 @@ from sum_numbers_tool import sum_numbers_with_complex_output
 load_dotenv()
 
 class Agent:
+    def __init__(self, cache=None):
+        self.cache = cache
+
     def invoke(self, messages: List[Tuple[str, str]]) -> str:
         llm = ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=self.cache
         )
 
         add_agent = create_react_agent(
@@ -1,14 +1,21 @@
 import os
+import threading
+from concurrent.futures import as_completed
 from dotenv import load_dotenv
 from typing import TypedDict, List, Annotated
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import operator
 
 from langchain_cohere.chat_models import ChatCohere
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.config import get_stream_writer
 from langgraph.types import Send
 from langgraph.graph import START, END, StateGraph
 
+from dish_cache import DishCache, dish_key
+from streaming_json import IncrementalArrayParser
+
 load_dotenv()
 
 class Dish(BaseModel):
@@ -38,15 +45,39 @@ class State(TypedDict):
     final_meal_guide: str  # Fully compiled, readable menu
 
 class Agent:
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None, max_workers: int = 4, dish_cache: DishCache = None, incremental_dispatch: bool = False):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
+        # at most max_workers nodes (chef workers) of one request run at the same time
+        self.config = {"max_concurrency": max_workers}
+        # and at most max_workers chefs call the LLM at the same time across all the requests of this
+        # agent (concurrent invokes, stream() and abatch()), whichever path dispatched them
+        self.chef_slots = threading.BoundedSemaphore(max_workers)
+
+        # completed chef guides, can be shared between agents so common dishes skip the LLM
+        self.dish_cache = dish_cache or DishCache()
+
+        # stream the plan and start each chef as soon as its dish is complete, instead of waiting
+        # for the whole Dishes object. The chefs then run on this pool, shared by all requests
+        # (it copies the run context, so callbacks and tracing still see the chef calls)
+        self.incremental_dispatch = incremental_dispatch
+        self.chef_executor = ContextThreadPoolExecutor(max_workers=max_workers) if incremental_dispatch else None
+
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
+
     def _chef_worker(self, state: WorkerState):
         """Worker node that generates the cooking instructions for one meal section."""
 
+        cached_guide = self.dish_cache.get(state["section"])
+        if cached_guide is not None:
+            print(f"chef worker cache hit: {state['section'].name}\n\n")
+            return {"completed_menu": [cached_guide]}
+
         chef_prompt = ChatPromptTemplate.from_messages([
             (
                 "system",
@@ -67,21 +98,21 @@ class Agent:
 
         # Use the language model to generate a meal preparation plan
         # The model receives the dish name, location, and ingredients from the current section
-        meal_plan = chef_pipe.invoke({
-            "name": state["section"].name,
-            "location": state["section"].location,
-            "ingredients": state["section"].ingredients
-        })
+        with self.chef_slots:
+            meal_plan = chef_pipe.invoke({
+                "name": state["section"].name,
+                "location": state["section"].location,
+                "ingredients": state["section"].ingredients
+            })
 
         # Return the generated meal plan wrapped in a list under completed_sections
         # This will be merged into the main state using operator.add in LangGraph
+        self.dish_cache.set(state["section"], meal_plan.content)
         resp = {"completed_menu": [meal_plan.content]}
         print(f"chef worker response: {resp}\n\n")
         return resp
 
-    def _orchestrator(self, state: State):
-        """Orchestrator that generates a structured dish list from the given meals."""
-
+    def _dish_prompt(self):
         # construct a prompt template
         dish_prompt = ChatPromptTemplate.from_messages([
             (
@@ -98,8 +129,13 @@ class Agent:
             )
         ])
 
+        return dish_prompt
+
+    def _orchestrator(self, state: State):
+        """Orchestrator that generates a structured dish list from the given meals."""
+
         # use LCEL to pipe the prompt to an LLM with a structured output of Dishes
-        planner_pipe = dish_prompt | self.llm.with_structured_output(Dishes)
+        planner_pipe = self._dish_prompt() | self.llm.with_structured_output(Dishes)
 
         # use the planner_pipe LLM to break the user's meal list into structured dish sections
         dish_descriptions = planner_pipe.invoke({"meals": state["meals"]})
@@ -109,11 +145,79 @@ class Agent:
         print(f"orchestrator response: {resp}\n\n")
         return resp
     
+    def _incremental_orchestrator(self, state: State):
+        """Orchestrator that streams the Dishes tool call and starts each chef as soon as its dish is complete."""
+
+        # unlike with_structured_output, bind_tools lets the model answer in text, the call is forced
+        # ("REQUIRED" is Cohere's value, other providers take their own)
+        planner_pipe = self._dish_prompt() | self.llm.bind_tools([Dishes], tool_choice="REQUIRED")
+        parser = IncrementalArrayParser("sections")
+        futures = {}
+        # stream() gets each guide as its chef finishes, not all of them with this node's update
+        write = get_stream_writer()
+        written = set()
+
+        def dispatch(dish: Dish):
+            # identical dishes are only cooked once, like in _assign_workers
+            key = dish_key(dish)
+            if key not in futures:
+                print(f"dispatching chef worker for {dish.name}\n\n")
+                futures[key] = self.chef_executor.submit(self._chef_worker, {"section": dish})
+
+        def write_guides(futures_to_write):
+            for future in futures_to_write:
+                if future not in written:
+                    written.add(future)
+                    for guide in future.result()["completed_menu"]:
+                        write({"dish_guide": guide})
+
+        message, call_index = None, None
+        for chunk in planner_pipe.stream({"meals": state["meals"]}):
+            message = chunk if message is None else message + chunk
+            for tool_chunk in chunk.tool_call_chunks:
+                # only the first tool call is the plan
+                call_index = tool_chunk.get("index") if call_index is None else call_index
+                if tool_chunk.get("index") != call_index:
+                    continue
+                for item in parser.feed(tool_chunk.get("args") or ""):
+                    try:
+                        dispatch(Dish(**item))
+                    except ValidationError:
+                        # left to the validation of the complete plan below
+                        continue
+            # chefs that finished while the plan was still streaming
+            write_guides([future for future in futures.values() if future.done()])
+
+        if message is not None and message.tool_calls:
+            # the complete call also covers models that don't stream tool call arguments
+            dish_descriptions = Dishes(**message.tool_calls[0]["args"])
+        else:
+            # no plan came as a tool call (an empty stream, or a model that ignored tool_choice)
+            print("orchestrator: no Dishes tool call in the streamed reply, planning with structured output\n\n")
+            dish_descriptions = (self._dish_prompt() | self.llm.with_structured_output(Dishes)).invoke({"meals": state["meals"]})
+        for dish in dish_descriptions.sections:
+            dispatch(dish)
+
+        write_guides(as_completed(futures.values()))
+        completed_menu = [guide for future in futures.values() for guide in future.result()["completed_menu"]]
+        resp = {"sections": dish_descriptions.sections, "completed_menu": completed_menu}
+        print(f"orchestrator response: {resp}\n\n")
+        return resp
+
     def _assign_workers(self, state: State):
         """Assign a worker to each section in the plan"""
 
-        # Kick off section writing in parallel via Send() API
-        resp = [Send("chef_worker", {"section": s}) for s in state["sections"]]
+        if self.incremental_dispatch:
+            # the chefs already ran while the plan was streaming
+            return "synthesizer"
+
+        # identical dishes (same name, location and ingredients) are only cooked once
+        unique_sections = {}
+        for s in state["sections"]:
+            unique_sections.setdefault(dish_key(s), s)
+
+        # Kick off section writing in parallel via Send() API, bounded by max_concurrency
+        resp = [Send("chef_worker", {"section": s}) for s in unique_sections.values()]
         print(f"assigning the workers: {resp}\n\n")
         return resp
     
@@ -128,17 +232,19 @@ class Agent:
 
         return {"final_meal_guide": completed_menu}
     
-    def invoke(self, user_input):
+    def _build_graph(self):
         # instantiate the builder
         orchestrator_worker_builder = StateGraph(State)
 
         # add the nodes
-        orchestrator_worker_builder.add_node("orchestrator", self._orchestrator)
+        orchestrator_worker_builder.add_node(
+            "orchestrator", self._incremental_orchestrator if self.incremental_dispatch else self._orchestrator
+        )
         orchestrator_worker_builder.add_node("chef_worker", self._chef_worker)
         orchestrator_worker_builder.add_node("synthesizer", self._synthesizer)
 
         orchestrator_worker_builder.add_conditional_edges(
-            "orchestrator", self._assign_workers, ["chef_worker"] # source node, routing function, list of allowed targets
+            "orchestrator", self._assign_workers, ["chef_worker", "synthesizer"] # source node, routing function, list of allowed targets
         )
 
         # add the edges, connections between nodes
@@ -147,8 +253,39 @@ class Agent:
         orchestrator_worker_builder.add_edge("synthesizer", END)
 
         # compile the builder to get a complete workflow executable
-        orchestrator_worker = orchestrator_worker_builder.compile()
+        return orchestrator_worker_builder.compile()
+
+    def invoke(self, user_input):
+        state = self.graph.invoke(user_input, config=self.config)
+
+        return state
+
+    def _stream_events(self, mode: str, chunk: dict):
+        if mode == "custom":
+            # with incremental_dispatch the orchestrator writes each guide as its chef finishes
+            yield chunk
+            return
+        # "updates" chunks map the node name to what it wrote, each chef worker arrives on its own
+        for node, values in chunk.items():
+            if node == "chef_worker":
+                for dish_guide in values.get("completed_menu", []):
+                    yield {"dish_guide": dish_guide}
+            elif node == "synthesizer":
+                yield {"final_meal_guide": values["final_meal_guide"]}
+
+    def stream(self, user_input):
+        """Yield {"dish_guide": ...} as soon as each chef finishes, then {"final_meal_guide": ...}."""
+        for mode, chunk in self.graph.stream(user_input, config=self.config, stream_mode=["updates", "custom"]):
+            yield from self._stream_events(mode, chunk)
+
+    async def astream(self, user_input):
+        """Async version of stream()."""
+        async for mode, chunk in self.graph.astream(user_input, config=self.config, stream_mode=["updates", "custom"]):
+            for event in self._stream_events(mode, chunk):
+                yield event
 
-        state = orchestrator_worker.invoke(user_input)
+    async def abatch(self, user_inputs):
+        # max_concurrency also caps how many requests of the batch run at once
+        states = await self.graph.abatch(user_inputs, config=self.config, return_exceptions=True)
 
-        return state
\ No newline at end of file
+        return states
\ No newline at end of file
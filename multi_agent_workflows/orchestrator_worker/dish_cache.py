@@ -0,0 +1,30 @@
+import os
+import re
+import sys
+from typing import Optional
+
+# the LRU + TTL cache itself lives in caching/ at the repository root, shared with the other agents
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from caching.keyed_cache import KeyedTTLCache
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def dish_key(dish) -> str:
+    """Dishes that differ only in case, spacing or ingredient order share a key."""
+    ingredients = sorted({_normalize(i) for i in dish.ingredients})
+    return "|".join([_normalize(dish.name), _normalize(dish.location), ",".join(ingredients)])
+
+
+class DishCache(KeyedTTLCache):
+    """
+    Completed chef guides keyed by the normalized Dish.
+
+    One instance can be passed to several Agent instances so common dishes skip the LLM on
+    repeat requests. Entries are evicted least recently used first and expire after ttl_seconds.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        super().__init__(dish_key, max_entries, ttl_seconds)
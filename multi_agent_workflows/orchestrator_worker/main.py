@@ -2,10 +2,13 @@ from agent import Agent
 
 
 def main():
+    # each dish guide is printed as soon as its chef is done, the joined guide comes last
     agent = Agent()
-    resp = agent.invoke(user_input={"meals": "Steak and eggs, tacos, and chili"})
-    return resp
+    for event in agent.stream(user_input={"meals": "Steak and eggs, tacos, and chili"}):
+        if "dish_guide" in event:
+            print(f"dish guide ready:\n{event['dish_guide']}\n")
+        else:
+            print(f"final meal guide:\n{event['final_meal_guide']}")
 
 if __name__ == "__main__":
-    resp = main()
-    print(resp)
\ No newline at end of file
+    main()
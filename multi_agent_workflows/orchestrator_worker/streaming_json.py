@@ -0,0 +1,66 @@
+import json
+from typing import Any, List, Optional
+
+
+class IncrementalArrayParser:
+    """
+    Returns the items of one array of a streamed JSON object as soon as each item is complete.
+
+    feed() takes the next fragment of the object text (for example the argument fragments of a
+    streamed tool call) and returns the object items of the array stored under `key` that were
+    completed by this fragment. Only string state and nesting depth are tracked, the finished
+    items themselves are decoded with json.loads.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._array_depth: Optional[int] = None # depth inside the target array while it is open
+        self._item_start: Optional[int] = None
+
+    def feed(self, fragment: str) -> List[Any]:
+        self._text += fragment
+        items = []
+
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = self._text[self._string_start:self._pos + 1]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char == ":" and self._depth == 1:
+                # a key of the top-level object was just closed
+                self._current_key = json.loads(self._last_string)
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._current_key == self.key:
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = self._pos
+            elif char in "}]":
+                if char == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    items.append(json.loads(self._text[self._item_start:self._pos + 1]))
+                    self._item_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+
+            self._pos += 1
+
+        return items
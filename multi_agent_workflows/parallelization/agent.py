@@ -1,72 +1,126 @@
 import os
+import asyncio
+import threading
+import weakref
 from dotenv import load_dotenv
-from typing import TypedDict
+from typing import TypedDict, List, Dict, Annotated
 
 from langchain_cohere.chat_models import ChatCohere
+from langchain_core.runnables import RunnableLambda
+from langgraph.types import Send
 from langgraph.graph import START, END, StateGraph
 
 load_dotenv()
 
+DEFAULT_LANGUAGES = ["French", "Spanish", "Japanese"]
+
+def merge_translations(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Reducer that merges the translations written by the parallel branches."""
+    return {**(left or {}), **(right or {})}
+
 class State(TypedDict):
     text: str
-    french: str
-    spanish: str
-    japanese: str
+    languages: List[str] # optional, overrides the agent's target languages for this request
+    translations: Annotated[Dict[str, str], merge_translations] # language -> translated text
     combined_output: str
 
+class TranslationState(TypedDict):
+    text: str
+    language: str
+
 class Agent:
-    def __init__(self):
-        self.llm = ChatCohere(
-            cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+    def __init__(self, llm=None, cache=None, languages: List[str] = None, max_concurrency: int = 16):
+        self.llm = llm or ChatCohere(
+            cohere_api_key=os.environ.get("CO_API_KEY"),
+            model="command-a-03-2025",
+            cache=cache
         )
 
-    def _translate_french(self, state: State) -> dict:
-        print("Translating to french...")
-        response = self.llm.invoke(f"Translate the following text to French:\n\n{state['text']}")
-        return {"french": response.content.strip()}
-    
-    def _translate_spanish(self, state: State) -> dict:
-        print("Translating to spanich...")
-        response = self.llm.invoke(f"Translate the following text to Spanish:\n\n{state['text']}")
-        return {"spanish": response.content.strip()}
-    
-    def _translate_japanese(self, state: State) -> dict:
-        print("Translating to japanese...")
-        response = self.llm.invoke(f"Translate the following text to Japanese:\n\n{state['text']}")
-        return {"japanese": response.content.strip()}
-    
+        # a translation has one right answer, temperature 0 makes it repeatable and lets the LLM cache keep it
+        self.llm_translate = self.llm.bind(temperature=0)
+
+        self.languages = languages or DEFAULT_LANGUAGES
+
+        # limits how many translation calls are in flight at once, shared by every request on this agent.
+        # An asyncio.Semaphore binds to the first event loop that waits on it, so each running loop
+        # (a second asyncio.run(), a server loop) gets its own, created on first use
+        self.max_concurrency = max_concurrency
+        self._sync_limiter = threading.BoundedSemaphore(max_concurrency)
+        self._async_limiters = weakref.WeakKeyDictionary() # event loop -> its semaphore
+        self._async_limiters_lock = threading.Lock()
+
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
+
+    def _async_limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._async_limiters_lock:
+            limiter = self._async_limiters.get(loop)
+            if limiter is None:
+                limiter = self._async_limiters[loop] = asyncio.Semaphore(self.max_concurrency)
+        return limiter
+
+    def _target_languages(self, state: State) -> List[str]:
+        return state.get("languages") or self.languages
+
+    def _translation_prompt(self, state: TranslationState) -> str:
+        return f"Translate the following text to {state['language']}:\n\n{state['text']}"
+
+    def _translate(self, state: TranslationState) -> dict:
+        print(f"Translating to {state['language'].lower()}...")
+        with self._sync_limiter:
+            response = self.llm_translate.invoke(self._translation_prompt(state))
+        return {"translations": {state["language"]: response.content.strip()}}
+
+    async def _atranslate(self, state: TranslationState) -> dict:
+        print(f"Translating to {state['language'].lower()}...")
+        async with self._async_limiter():
+            response = await self.llm_translate.ainvoke(self._translation_prompt(state))
+        return {"translations": {state["language"]: response.content.strip()}}
+
+    def _assign_translations(self, state: State):
+        """Fan out one translation branch per target language via Send() API"""
+        return [
+            Send("translate", {"text": state["text"], "language": language})
+            for language in self._target_languages(state)
+        ]
+
     def _aggregator(self, state: State) -> dict:
         combined = f"Original Text: {state['text']}\n\n"
-        combined += f"French: {state['french']}\n\n"
-        combined += f"Spanish: {state['spanish']}\n\n"
-        combined += f"Japanese: {state['japanese']}\n"
-        return {"combined_output": combined}
-    
-    def invoke(self, input_text):
+        for language in self._target_languages(state):
+            combined += f"{language}: {state['translations'][language]}\n\n"
+        return {"combined_output": combined.rstrip("\n") + "\n"}
+
+    def _build_graph(self):
         graph = StateGraph(State)
 
-        graph.add_node("translate_french", self._translate_french)
-        graph.add_node("translate_spanish", self._translate_spanish)
-        graph.add_node("translate_japanese", self._translate_japanese)
+        # the same node runs with llm.invoke under invoke() and with llm.ainvoke under ainvoke()
+        graph.add_node("translate", RunnableLambda(self._translate, afunc=self._atranslate))
         graph.add_node("aggregator", self._aggregator)
 
-        # Connect parallel nodes from START
-        graph.add_edge(START, "translate_french")
-        graph.add_edge(START, "translate_spanish")
-        graph.add_edge(START, "translate_japanese")
+        # Connect one parallel translation branch per language from START
+        graph.add_conditional_edges(START, self._assign_translations, ["translate"])
 
-        # Connect all translation nodes to the aggregator
-        graph.add_edge("translate_french", "aggregator")
-        graph.add_edge("translate_spanish", "aggregator")
-        graph.add_edge("translate_japanese", "aggregator")
+        # Connect all translation branches to the aggregator
+        graph.add_edge("translate", "aggregator")
 
         # Final node
         graph.add_edge("aggregator", END)
 
         # Compile the graph
-        app = graph.compile()
+        return graph.compile()
+
+    def invoke(self, input_text):
+        result = self.graph.invoke(input_text)
+
+        return result
+
+    async def ainvoke(self, input_text):
+        result = await self.graph.ainvoke(input_text)
+
+        return result
 
-        result = app.invoke(input_text)
+    async def abatch(self, input_texts):
+        results = await self.graph.abatch(input_texts, return_exceptions=True)
 
-        return result
\ No newline at end of file
+        return results
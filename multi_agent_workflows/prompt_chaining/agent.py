@@ -13,12 +13,16 @@ class ChainState(TypedDict):
     cover_letter: str
 
 class Agent:
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
+
     def _generate_cover_letter(self, state: ChainState) -> ChainState:
         prompt = f"""
         You're a cover letter writing assistant. Using the resume summary below, write a professional and personalized cover letter for the following job.
@@ -46,7 +50,7 @@ class Agent:
 
         return {**state, "resume_summary": response.content}
     
-    def invoke(self, input_state):
+    def _build_graph(self):
         workflow = StateGraph(ChainState)
         workflow.add_node("generate_resume_summary", self._generate_resume_summary)
         workflow.add_node("generate_cover_letter", self._generate_cover_letter)
@@ -54,7 +58,14 @@ class Agent:
         workflow.add_edge("generate_resume_summary", "generate_cover_letter")
         workflow.set_finish_point("generate_cover_letter")
         
-        app = workflow.compile()
-        result = app.invoke(input_state)
+        return workflow.compile()
+
+    def invoke(self, input_state):
+        result = self.graph.invoke(input_state)
         
-        return result["resume_summary"]
\ No newline at end of file
+        return result["resume_summary"]
+
+    async def abatch(self, input_states):
+        results = await self.graph.abatch(input_states, return_exceptions=True)
+
+        return [result if isinstance(result, Exception) else result["resume_summary"] for result in results]
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import TypedDict, List, Annotated, Literal
+from typing import TypedDict, List, Annotated, Literal, get_args
 from pydantic import BaseModel, Field
 import operator
 
@@ -19,6 +19,9 @@ grades = Literal[
     "high risk"
 ]
 
+# grades from the least to the most risky, used to find the candidate closest to the target
+GRADE_ORDER = list(get_args(grades))
+
 class State(TypedDict):
     investment_plan: str
     investor_profile: str
@@ -26,6 +29,7 @@ class State(TypedDict):
     feedback: str
     grade: grades
     n: int = 0
+    candidate_plans: List[str] # plans generated in the current round when candidates > 1
 
 class Feedback(BaseModel):
     grade: grades = Field(
@@ -36,11 +40,25 @@ class Feedback(BaseModel):
     )
 
 class Agent:
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None, candidates: int = 1):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
+
+        # number of plans generated concurrently each round, all of them are graded in one batch
+        # and the first one matching the target grade is accepted. 1 keeps one plan per round
+        self.candidates = candidates
+
+        # the pipes are built once and shared by every node call
+        self.cathie_wood_pipe = self._cathie_wood_pipe()
+        self.ray_dalio_pipe = self._ray_dalio_pipe()
+        self.buffett_evaluator_pipe = self._buffett_evaluator_pipe()
+        self.grade_pipe = self._grade_pipe()
+
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
     
     def _cathie_wood_pipe(self):
         # inital generation, no feedback, only based on profile
@@ -163,8 +181,7 @@ class Agent:
         buffett_evaluator_pipe = evaluator_prompt | self.llm.with_structured_output(Feedback)
         return buffett_evaluator_pipe
 
-    def _determine_target_grade(self, state: State):
-        """Ask the LLM to pick the best-fitting target_grade."""
+    def _grade_pipe(self):
         grade_prompt = ChatPromptTemplate.from_messages([
             (
                 "system",
@@ -178,48 +195,38 @@ class Agent:
             )
         ])
 
-        grade_pipe = grade_prompt | self.llm
+        # the grade only classifies, temperature 0 makes it repeatable and lets the LLM cache keep it
+        grade_pipe = grade_prompt | self.llm.bind(temperature=0)
+        return grade_pipe
 
-        response = grade_pipe.invoke({
+    def _determine_target_grade(self, state: State):
+        """Ask the LLM to pick the best-fitting target_grade."""
+        response = self.grade_pipe.invoke({
             "investor_profile": state["investor_profile"]
         })
         
         # return as a plain dict so LangGraph can merge it into the state
         return {"target_grade": response.content.lower()}
     
-    def _investment_plan_generator(self, state: State) -> dict:
-        """Prompts an LLM to generate or improve an investment plan based on the current state."""
-        if state.get("feedback"):
-            # use Ray Dalio–style generator when feedback is available
-            response = self._ray_dalio_pipe().invoke({
-                "investor_profile": state["investor_profile"],
-                "grade": state["grade"],
-                "feedback": state["feedback"]
-            })
-        else:
-            # use Cathie Wood–style generator for initial plan
-            response = self._cathie_wood_pipe().invoke({
-                "investor_profile": state["investor_profile"]
-            })
+    def _initial_plan_generator(self, state: State) -> dict:
+        """Cathie Wood–style initial plan, it only needs the profile so it runs next to _determine_target_grade."""
+        return self._generate_plans(self.cathie_wood_pipe, {"investor_profile": state["investor_profile"]})
 
-        return {"investment_plan": response.content}
-    
     def _investment_plan_generator(self, state: State) -> dict:
-        """Prompts an LLM to generate or improve an investment plan based on the current state."""
+        """Ray Dalio–style plan improved with the feedback of the last evaluation."""
+        return self._generate_plans(self.ray_dalio_pipe, {
+            "investor_profile": state["investor_profile"],
+            "grade": state["grade"],
+            "feedback": state["feedback"]
+        })
 
-        if state.get("feedback"):
-            # use Ray Dalio–style generator when feedback is available
-            response = self._ray_dalio_pipe().invoke({
-                "investor_profile": state["investor_profile"],
-                "grade": state["grade"],
-                "feedback": state["feedback"]
-            })
-        else:
-            # use Cathie Wood–style generator for initial plan
-            response = self._cathie_wood_pipe().invoke({
-                "investor_profile": state["investor_profile"]
-            })
+    def _generate_plans(self, pipe, inputs: dict) -> dict:
+        if self.candidates > 1:
+            # the candidates are sampled concurrently from the same prompt
+            responses = pipe.batch([inputs] * self.candidates, config={"max_concurrency": self.candidates})
+            return {"candidate_plans": [response.content for response in responses]}
 
+        response = pipe.invoke(inputs)
         return {"investment_plan": response.content}
     
     def _evaluate_plan(self, state: State):
@@ -228,15 +235,45 @@ class Agent:
         # add one to the current count
         current_count = state.get('n', 0) + 1
 
-        # get the evaluation result from the evaluator pipe
-        evaluation_result = self._buffett_evaluator_pipe().invoke({
-            "investment_plan": state["investment_plan"],
-            "investor_profile": state["investor_profile"],
-            "target_grade": state["target_grade"]
-        })
-
-        # return the grade and feedback in a dict
-        return {"grade": evaluation_result.grade, "feedback": evaluation_result.feedback, "n": current_count}
+        plans = state["candidate_plans"] if self.candidates > 1 else [state["investment_plan"]]
+        inputs = [
+            {
+                "investment_plan": plan,
+                "investor_profile": state["investor_profile"],
+                "target_grade": state["target_grade"]
+            }
+            for plan in plans
+        ]
+
+        # get the evaluation results from the evaluator pipe, candidates are graded in one batch call
+        evaluator = self.buffett_evaluator_pipe
+        if len(inputs) > 1:
+            results = evaluator.batch(inputs, config={"max_concurrency": len(inputs)})
+        else:
+            results = [evaluator.invoke(inputs[0])]
+
+        best = self._pick_candidate(results, state["target_grade"])
+        evaluation_result = results[best]
+
+        # return the chosen plan with its grade and feedback in a dict
+        return {
+            "investment_plan": plans[best],
+            "grade": evaluation_result.grade,
+            "feedback": evaluation_result.feedback,
+            "n": current_count
+        }
+
+    @staticmethod
+    def _pick_candidate(results: List[Feedback], target_grade: str) -> int:
+        """Index of the first candidate graded as the target, otherwise of the closest grade."""
+        for i, result in enumerate(results):
+            if result.grade == target_grade:
+                return i
+
+        if target_grade not in GRADE_ORDER:
+            return 0
+        target = GRADE_ORDER.index(target_grade)
+        return min(range(len(results)), key=lambda i: abs(GRADE_ORDER.index(results[i].grade) - target))
     
     def _route_investment(self, state: State, iteration_limit: int = 5):
         """Route investment based on risk grade evaluation"""
@@ -253,6 +290,8 @@ class Agent:
         print(f"Target risk profile: '{target_grade}'")
         print(f"Match: {match}")
         print(f"Number of trials: {state['n']}")
+        if self.candidates > 1:
+            print(f"Candidates per trial: {self.candidates}")
 
         # routing logic
         if match: # grades match
@@ -265,18 +304,22 @@ class Agent:
             print("→ Routing to: Rejected + Feedback")
             return "Rejected + Feedback"
         
-    def invoke(self, user_input):
+    def _build_graph(self):
         # initialize StateGraph with the given State schema
         optimizer_builder = StateGraph(State)
 
         # add the setup, generator, and evaluator nodes
         optimizer_builder.add_node("determine_target_grade", self._determine_target_grade)
+        optimizer_builder.add_node("initial_plan_generator", self._initial_plan_generator)
         optimizer_builder.add_node("investment_plan_generator", self._investment_plan_generator)
         optimizer_builder.add_node("evaluate_plan", self._evaluate_plan)
 
-        # define the flow with edges
+        # define the flow with edges: the target grade and the first plan only depend on the
+        # investor profile, so they run in parallel and the first evaluation waits for both
         optimizer_builder.add_edge(START, "determine_target_grade")
-        optimizer_builder.add_edge("determine_target_grade", "investment_plan_generator")
+        optimizer_builder.add_edge(START, "initial_plan_generator")
+        optimizer_builder.add_edge(["determine_target_grade", "initial_plan_generator"], "evaluate_plan")
+        # later rounds go straight from the revised plan back to the evaluation
         optimizer_builder.add_edge("investment_plan_generator", "evaluate_plan")
 
         # add conditional edge for reflection
@@ -290,8 +333,14 @@ class Agent:
         )
 
         # compile the workflow
-        optimizer_workflow = optimizer_builder.compile()
+        return optimizer_builder.compile()
+
+    def invoke(self, user_input):
+        state = self.graph.invoke(user_input)
+
+        return state
 
-        state = optimizer_workflow.invoke(user_input)
+    async def abatch(self, user_inputs):
+        states = await self.graph.abatch(user_inputs, return_exceptions=True)
 
-        return state
\ No newline at end of file
+        return states
\ No newline at end of file
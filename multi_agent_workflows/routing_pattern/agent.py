@@ -19,13 +19,20 @@ class Router(BaseModel):
     
 
 class Agent:
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
-        self.llm_router = self.llm.bind_tools([Router])
+        # routing and translation have one right answer, temperature 0 makes them repeatable and
+        # lets the LLM cache keep them (the summary stays at the provider default)
+        self.llm_router = self.llm.bind_tools([Router], temperature=0)
+        self.llm_translate = self.llm.bind(temperature=0)
+
+        # build and compile the workflow once, every invoke reuses it
+        self.graph = self._build_graph()
 
     def _router_node(self, state: RouterState) -> RouterState:
         routing_prompt = f"""
@@ -55,11 +62,11 @@ class Agent:
     
     def _translate_node(self, state: RouterState) -> RouterState:
         prompt = f"Translate the following text to French:\n\n{state['user_input']}"
-        response = self.llm.invoke(prompt)
+        response = self.llm_translate.invoke(prompt)
 
         return {**state, "task_type": "translate", "output": response.content}
     
-    def invoke(self, input_text):
+    def _build_graph(self):
         workflow = StateGraph(RouterState)
         workflow.add_node("router", self._router_node)
         workflow.add_node("summarize", self._summarize_node)
@@ -75,8 +82,14 @@ class Agent:
         workflow.set_finish_point("summarize")
         workflow.set_finish_point("translate")
 
-        app = workflow.compile()
+        return workflow.compile()
+
+    def invoke(self, input_text):
+        result = self.graph.invoke(input_text)
+
+        return result
 
-        result = app.invoke(input_text)
+    async def abatch(self, input_texts):
+        results = await self.graph.abatch(input_texts, return_exceptions=True)
 
-        return result
\ No newline at end of file
+        return results
\ No newline at end of file
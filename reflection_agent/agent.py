@@ -15,12 +15,14 @@ class AgentState(TypedDict):
     Annotated[..., operator.add] sugere que o grafo pode “somar/concatenar” listas ao combinar estados (dependendo de como StateGraph usa o schema). Na prática, isso indica que quando um nó retorna {"messages": [...]}, esses itens são concatenados à lista existente no estado.
     """
     messages: Annotated[List[BaseMessage], operator.add]
+    generations: Annotated[int, operator.add] # quantas versões do post já foram geradas nesta execução
 
 class ReflectionAgent:
-    def __init__(self):
-        llm = ChatCohere(
+    def __init__(self, llm=None, cache=None, max_generations: int = 3):
+        llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
         generation_prompt = ChatPromptTemplate.from_messages(
@@ -62,15 +64,17 @@ class ReflectionAgent:
 
         self.reflect_chain = reflection_prompt | llm
 
-        # Initialize a predefined MessageGraph
-        self.graph = StateGraph(state_schema=AgentState)
+        self.max_generations = max_generations
+
+        # O grafo é compilado uma única vez, cada chamada de call() reutiliza o mesmo grafo
+        self.graph = self._build_graph()
 
     def _generation_node(self, state: AgentState) -> dict:
         messages = state["messages"]
 
         # Passar a lista de mensagens diretamente, não um dicionário
         generated_post = self.generate_chain.invoke({"messages": messages})
-        return {"messages": [AIMessage(content=generated_post.content)]}
+        return {"messages": [AIMessage(content=generated_post.content)], "generations": 1}
     
     def _reflection_node(self, state: AgentState) -> dict:
         messages = state["messages"]
@@ -86,20 +90,21 @@ class ReflectionAgent:
         return {"messages": [HumanMessage(content=res.content)]}
     
     def _should_continue(self, state: AgentState):
-        messages = state["messages"]
-        if len(messages) >= 6:  # 3 ciclos completos (cada ciclo adiciona 2 mensagens)
+        # o contador fica no estado do grafo, então execuções simultâneas não interferem umas nas outras
+        if state["generations"] >= self.max_generations:  # 3 ciclos completos por padrão
             return END
         return "reflect"
 
-    def call(self, inputs):
+    def _build_graph(self):
         # Configurar o grafo
-        self.graph.add_node("generate", self._generation_node)
-        self.graph.add_node("reflect", self._reflection_node)
+        graph = StateGraph(state_schema=AgentState)
+        graph.add_node("generate", self._generation_node)
+        graph.add_node("reflect", self._reflection_node)
         
         # Definir as transições
-        self.graph.set_entry_point("generate")
-        self.graph.add_edge("reflect", "generate") # após finalizar o reflect, agora meu grafo sabe que deve voltar para generate
-        self.graph.add_conditional_edges( # aqui eu defino que o meu grafo vai de generate para should continue e daí para reflect
+        graph.set_entry_point("generate")
+        graph.add_edge("reflect", "generate") # após finalizar o reflect, agora meu grafo sabe que deve voltar para generate
+        graph.add_conditional_edges( # aqui eu defino que o meu grafo vai de generate para should continue e daí para reflect
             "generate", 
             self._should_continue,
             {
@@ -108,7 +113,9 @@ class ReflectionAgent:
             }
         )
         
-        # Compilar e executar
-        workflow = self.graph.compile()
-        response = workflow.invoke(inputs)
+        # Compilar
+        return graph.compile()
+
+    def call(self, inputs):
+        response = self.graph.invoke(inputs)
         return response
@@ -1,5 +1,7 @@
 import os
 import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from typing import List, Annotated, TypedDict
 import operator
@@ -11,10 +13,17 @@ from langchain_core.messages import HumanMessage, ToolMessage, BaseMessage
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langgraph.graph import END, StateGraph
 
+from search_cache import SearchCache, normalize_query
+from trace_writer import trace_writer
+
 load_dotenv()
 
 class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], operator.add]
+    searched_queries: Annotated[List[str], operator.add] # normalized queries already searched in this invocation
+    run_id: str # identifies this invocation in the trace
+    trace_path: str # JSONL file the trace records of this invocation go to
+    revisions: Annotated[int, operator.add] # revisor rounds done in this invocation
 
 class Reflection(BaseModel):
 	missing: str = Field(description="What information is missing")
@@ -30,10 +39,12 @@ class ReviseAnswer(AnswerQuestion):
     references: List[str] = Field(description="Citations motivating your updated answer.")
      
 class ReflexionAgent:
-    def __init__(self):
-        self.llm = ChatCohere(
+    def __init__(self, llm=None, cache=None, search_tool=None, search_cache: SearchCache = None, max_search_workers: int = 4,
+                 trace_path: str = "reflexion_agent/trace.jsonl", max_revisions: int = 4):
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
-            model="command-a-03-2025"
+            model="command-a-03-2025",
+            cache=cache
         )
 
         self.prompt_template = ChatPromptTemplate.from_messages([
@@ -70,95 +81,121 @@ class ReflexionAgent:
         - When discussing nutritional interventions, consider metabolic flexibility, insulin sensitivity, and individual response variability.
         """
         self.revisor_prompt = self.prompt_template.partial(first_instruction=revise_instructions)
-        
-        self.loop_count = 0
-        self.tavily_tool = TavilySearchResults(max_results=3)
-        self.graph = StateGraph(state_schema=AgentState)
+
+        # chains are built once and shared by every invocation
+        first_responder_prompt = self.prompt_template.partial(first_instruction="Provide a detailed ~250 word answer")
+        self.responder_chain = first_responder_prompt | self.llm.bind_tools(tools=[AnswerQuestion])
+        self.revisor_chain = self.revisor_prompt | self.llm.bind_tools(tools=[ReviseAnswer])
+
+        # the loop counter lives in the graph state, so concurrent invocations of one instance don't share it
+        self.max_revisions = max_revisions
+        self.tavily_tool = search_tool or TavilySearchResults(max_results=3)
+
+        # searches of one round run concurrently, results are memoized and can be shared between agents
+        self.search_executor = ThreadPoolExecutor(max_workers=max_search_workers)
+        self.search_cache = search_cache or SearchCache()
+
+        # default trace file, invoke() can send a run to another one
+        self.trace_path = trace_path
+
+        # compiled once, invoke() only runs it
+        self.graph = self._build_graph()
     
+    def _trace(self, state: AgentState, event: str, **data):
+        # handed to the background writer, never blocks the graph
+        trace_writer.emit(state.get("trace_path") or self.trace_path, state.get("run_id"), event, **data)
+
     def _execute_tools(self, state: AgentState):
         last_ai_message = state["messages"][-1]
 
-        with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-            file.write("\n\n--------EXECUTE TOOLS--------\n\n")
-            file.write(f"last message: {last_ai_message}")
+        self._trace(state, "execute_tools", last_message=last_ai_message)
 
-        tool_messages = []
-        for tool_call in last_ai_message.tool_calls:
-            if tool_call["name"] in ["AnswerQuestion", "ReviseAnswer"]:
-                call_id = tool_call["id"]
-                search_queries = tool_call["args"].get("search_queries", [])
-                query_results = {}
-                for query in search_queries:
-                    result = self.tavily_tool.invoke(query)
+        search_calls = [
+            tool_call for tool_call in last_ai_message.tool_calls
+            if tool_call["name"] in ["AnswerQuestion", "ReviseAnswer"]
+        ]
 
-                    with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-                        file.write(f"\nsearch result: {result}\n\n")
+        # queries searched in an earlier round of this invocation are not repeated,
+        # the model already has their results in the message history
+        already_searched = set(state.get("searched_queries", []))
+        new_queries = {}
+        for tool_call in search_calls:
+            for query in tool_call["args"].get("search_queries", []):
+                key = normalize_query(query)
+                if key not in already_searched:
+                    new_queries.setdefault(key, query)
 
-                    query_results[query] = result
-                tool_messages.append(ToolMessage(
-                    content=json.dumps(query_results),
-                    tool_call_id=call_id)
-                )
+        results = dict(zip(new_queries, self.search_executor.map(self._search, new_queries.values())))
 
-        return {"messages": tool_messages}
+        self._trace(state, "search_results", results=results)
+
+        tool_messages = []
+        for tool_call in search_calls:
+            query_results = {}
+            for query in tool_call["args"].get("search_queries", []):
+                key = normalize_query(query)
+                query_results[query] = results[key] if key in results else "Already searched, see the earlier results for this query."
+            tool_messages.append(ToolMessage(
+                content=json.dumps(query_results),
+                tool_call_id=tool_call["id"])
+            )
+
+        return {"messages": tool_messages, "searched_queries": list(results)}
+
+    def _search(self, query: str):
+        result = self.search_cache.get(query)
+        if result is None:
+            result = self.tavily_tool.invoke(query)
+            self.search_cache.set(query, result)
+        return result
 
     def _revisor(self, state: AgentState):
-        revisor_chain = self.revisor_prompt | self.llm.bind_tools(tools=[ReviseAnswer])
-        response = revisor_chain.invoke({"messages": state["messages"]})
+        response = self.revisor_chain.invoke({"messages": state["messages"]})
 
-        with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-            file.write("\n\n-----REVISOR-----\n\n")
-            file.write(f"response: {response}")
-        
-        return {"messages": [response]}
+        self._trace(state, "revisor", response=response)
+
+        return {"messages": [response], "revisions": 1}
 
     def _responder(self, state: AgentState):
         messages = state["messages"]
 
-        first_responder_prompt = self.prompt_template.partial(first_instruction="Provide a detailed ~250 word answer")
-        chain = first_responder_prompt | self.llm.bind_tools(tools=[AnswerQuestion])
-
-        response = chain.invoke({"messages": messages})
+        response = self.responder_chain.invoke({"messages": messages})
 
-        with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-            file.write("\n-----RESPONDER-----\n")
-            file.write(f"response: {response}")
+        self._trace(state, "responder", response=response)
 
         return {"messages": [response]}
 
     def _event_loop(self, state: AgentState) -> str:
-        with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-            file.write(f"\n\nevent loope count: {self.loop_count}\n\n")
-
-        self.loop_count += 1
+        self._trace(state, "event_loop", revisions=state["revisions"])
 
-        if self.loop_count >= 4:
+        if state["revisions"] >= self.max_revisions:
             return END
         
         return "execute_tools"
 
-    
-    def invoke(self, query):
-        self.graph.add_node("respond", self._responder)
-        self.graph.add_node("execute_tools", self._execute_tools)
-        self.graph.add_node("revisor", self._revisor)
+    def _build_graph(self):
+        graph = StateGraph(state_schema=AgentState)
+        graph.add_node("respond", self._responder)
+        graph.add_node("execute_tools", self._execute_tools)
+        graph.add_node("revisor", self._revisor)
 
-        self.graph.add_edge("respond", "execute_tools")
-        self.graph.add_edge("execute_tools", "revisor")
+        graph.add_edge("respond", "execute_tools")
+        graph.add_edge("execute_tools", "revisor")
 
-        self.graph.add_conditional_edges("revisor", self._event_loop)
-        self.graph.set_entry_point("respond")  
-        
-        app = self.graph.compile()
+        graph.add_conditional_edges("revisor", self._event_loop, ["execute_tools", END])
+        graph.set_entry_point("respond")
+
+        return graph.compile()
 
-        initial_state = {"messages": [HumanMessage(content=query)]}
-        responses = app.invoke(initial_state)
+    def invoke(self, query, trace_path: str = None):
 
-        with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-            file.write(f"\n\n--------FINAL RESPONSE---------\n\n")
+        initial_state = {
+            "messages": [HumanMessage(content=query)],
+            "run_id": uuid.uuid4().hex,
+            "trace_path": trace_path or self.trace_path
+        }
+        responses = self.graph.invoke(initial_state)
 
-        for response in responses["messages"]:
-            with open("reflexion_agent/result.txt", "a", encoding="utf-8") as file:
-                file.write(f"\n\nresponse: {response}\n\n")
+        self._trace(responses, "final_response", messages=responses["messages"])
 
         return responses["messages"][-1]
\ No newline at end of file
@@ -0,0 +1,25 @@
+import os
+import re
+import sys
+from typing import Optional
+
+# the LRU + TTL cache itself lives in caching/ at the repository root, shared with the other agents
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from caching.keyed_cache import KeyedTTLCache
+
+
+def normalize_query(query: str) -> str:
+    """Queries that differ only in case, spacing or trailing punctuation are the same search."""
+    return re.sub(r"\s+", " ", query).strip().strip("?.!,;:").strip().lower()
+
+
+class SearchCache(KeyedTTLCache):
+    """
+    Memoized search results keyed by the normalized query.
+
+    One instance can be passed to several ReflexionAgent instances so they share results
+    across invocations. Entries are evicted least recently used first and expire after ttl_seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 24 * 3600):
+        super().__init__(normalize_query, max_entries, ttl_seconds)
@@ -0,0 +1,118 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+class TraceWriter:
+    """
+    Background JSONL trace sink.
+
+    emit() only puts the record on a bounded queue and never blocks the caller. When the queue
+    is full the record is dropped and counted. A daemon thread serializes the records and writes
+    them in batches, flushing after every batch, to the path each record names. At most
+    max_open_files files stay open, the least recently written one is closed to open another.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 256, flush_interval: float = 0.5,
+                 max_open_files: int = 16):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_open_files = max_open_files
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._files = OrderedDict() # path -> open file, least recently written first, only the writer thread touches it
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, path: str, run_id: str, event: str, **data):
+        if self._closed:
+            return
+        record = {"ts": time.time(), "run_id": run_id, "event": event, **data}
+        try:
+            self._queue.put_nowait((path, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def _file(self, path: str):
+        if path in self._files:
+            self._files.move_to_end(path)
+            return self._files[path]
+
+        # a trace_path per invocation would otherwise leave one handle open per path for good
+        while len(self._files) >= self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._files[path] = open(path, "a", encoding="utf-8")
+        return self._files[path]
+
+    def _write_batch(self, batch):
+        touched = {}
+        for path, record in batch:
+            file = self._file(path)
+            file.write(json.dumps(record, default=_to_json, ensure_ascii=False) + "\n")
+            touched[path] = file
+        for file in touched.values():
+            # an evicted file was closed, and so flushed, already
+            if not file.closed:
+                file.flush()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # tracing must never take the agent down
+                print(f"trace writer failed to write {len(batch)} records: {e}")
+            if stop:
+                break
+
+        for file in self._files.values():
+            file.close()
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write what is queued and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+# one writer thread shared by every agent in the process
+trace_writer = TraceWriter()
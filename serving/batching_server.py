@@ -0,0 +1,246 @@
+"""
+Local micro-batching HTTP server in front of any Agent class of the repository.
+
+Concurrent requests are collected into batches of at most --max-batch-size requests, waiting at
+most --max-wait-ms for a batch to fill. A batch goes through agent.abatch() when the agent has
+one (the compiled graph runs the batch concurrently over one shared LLM client) and otherwise
+through agent.<method>() on worker threads. The queue is bounded, a full queue answers 429.
+
+The agents' abatch() methods pass return_exceptions=True to graph.abatch(): a failed request comes
+back as its exception in place of its result, so only that request fails and not its whole batch.
+
+Run from the repository root, for example:
+    python -m serving.batching_server --agent-dir multi_agent_workflows/parallelization --port 8080
+
+    curl -X POST localhost:8080/invoke -d '{"input": {"text": "Good morning!"}}'
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from agent_loading.agent_loader import load_agent_module
+from caching.llm_cache import install_llm_cache
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class QueueFullError(Exception):
+    """Raised when the batcher queue is full and the request must be rejected."""
+
+
+class MicroBatcher:
+    """Collects submitted inputs into batches and runs each batch with one handler call."""
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 256,
+        max_concurrent_batches: int = 4
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self.stats = {"requests": 0, "rejected": 0, "batches": 0, "batched_requests": 0}
+        self._queue: asyncio.Queue = None
+        self._batch_slots: asyncio.Semaphore = None
+        self._collector: asyncio.Task = None
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        self._collector.cancel()
+        await asyncio.gather(self._collector, return_exceptions=True)
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFullError("Request queue is full, retry later")
+
+        self.stats["requests"] += 1
+        return await future
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # waits here when max_concurrent_batches are already running, the queue absorbs the rest
+            await self._batch_slots.acquire()
+            asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.stats["batches"] += 1
+        self.stats["batched_requests"] += len(batch)
+        try:
+            # the handler returns the exception of a failed request in its place, only that request fails
+            results = await self.handler([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            # the handler itself failed, no request of the batch has a result
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._batch_slots.release()
+
+
+def make_batch_handler(agent, method: str) -> Callable[[List[Any]], Awaitable[List[Any]]]:
+    """
+    Prefer the agent's abatch(), otherwise run its single-request method on worker threads. Either
+    way a failed request comes back as its exception in the results, next to the other results.
+    """
+    if hasattr(agent, "abatch"):
+        return agent.abatch
+
+    single = getattr(agent, method)
+
+    async def handler(inputs: List[Any]) -> List[Any]:
+        return await asyncio.gather(*(asyncio.to_thread(single, item) for item in inputs), return_exceptions=True)
+
+    return handler
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+class BatchingServer:
+    def __init__(self, batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8080):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+
+    async def _write(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+        body = json.dumps(payload, default=_to_json).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle_request(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", **self.batcher.stats, "queued": self.batcher._queue.qsize()}
+
+        if method != "POST" or path != "/invoke":
+            return 404, {"error": f"No route for {method} {path}"}
+
+        try:
+            payload = json.loads(body or b"{}")
+            item = payload["input"]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": 'Body must be JSON like {"input": ...}'}
+
+        try:
+            output = await self.batcher.submit(item)
+        except QueueFullError as e:
+            return 429, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+        return 200, {"output": output}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # one connection can carry many requests (HTTP/1.1 keep-alive)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {"error": "Body too large"}, keep_alive=False)
+                    break
+
+                body = await reader.readexactly(length) if length else b""
+                status, response = await self._handle_request(method, path, body)
+                await self._write(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"serving on http://{self.host}:{self.port} (max batch {self.batcher.max_batch_size}, max wait {self.batcher.max_wait_ms}ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP server for the repository agents.")
+    parser.add_argument("--agent-dir", required=True, help="Folder holding agent.py, e.g. multi_agent_workflows/parallelization")
+    parser.add_argument("--agent-class", default="Agent")
+    parser.add_argument("--method", default="invoke", help="Single-request method used when the agent has no abatch()")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--max-queue-size", type=int, default=256)
+    parser.add_argument("--max-concurrent-batches", type=int, default=4)
+    parser.add_argument("--llm-cache", help="SQLite file of a persistent LLM response cache shared by the agent")
+    parser.add_argument("--llm-cache-ttl", type=float, default=None, help="Seconds a cached response stays valid")
+    args = parser.parse_args()
+
+    if args.llm_cache:
+        install_llm_cache(args.llm_cache, ttl_seconds=args.llm_cache_ttl)
+
+    agent = getattr(load_agent_module(args.agent_dir), args.agent_class)()
+    batcher = MicroBatcher(
+        make_batch_handler(agent, args.method),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue_size=args.max_queue_size,
+        max_concurrent_batches=args.max_concurrent_batches
+    )
+    asyncio.run(BatchingServer(batcher, args.host, args.port).serve_forever())
@@ -1,32 +1,172 @@
+import ast
 import os
 from dotenv import load_dotenv
 
 from langchain_cohere.chat_models import ChatCohere
 from langchain_community.agent_toolkits import create_sql_agent
-from langchain_community.utilities.sql_database import SQLDatabase
+from langchain_community.agent_toolkits.sql.prompt import SQL_PREFIX
 from langchain.agents import AgentType
+from langchain_core.agents import AgentAction
+
+from cost_guard import CostGuard
+from database import AgentSQLDatabase, ExportSQLDatabaseTool
+from query_examples import QueryExample, QueryExampleIndex, database_namespace, default_index
+from result_cache import QueryResultCache
+from result_export import ResultExporter
 
 load_dotenv()
 
+DIRECT_ANSWER_PROMPT = """Answer the question using only the result of the SQL query below, in one or two sentences.
+
+Question: {question}
+SQL: {sql}
+Result: {result}
+Answer:"""
+
 class Agent:
-    def __init__(self):
-        db = SQLDatabase.from_uri(os.environ.get("DB_URI"))
+    def __init__(self, llm=None, cache=None, db_uri: str = None, schema_in_prompt: bool = True,
+                 schema_ttl_seconds: float = 300.0, max_schema_chars: int = 12000,
+                 pool_size: int = 5, max_overflow: int = 10, pool_pre_ping: bool = True, pool_recycle: int = 1800,
+                 read_only: bool = True, result_cache: QueryResultCache = None,
+                 max_query_cost: float = 1e7, max_rows: int = 1000, statement_timeout_ms: int = 30000,
+                 query_examples: QueryExampleIndex = None, few_shot_examples: int = 3,
+                 min_example_score: float = 0.5, direct_answer_score: float = 0.95,
+                 result_exporter: ResultExporter = None, export_max_rows: int = 1000000):
+        db_uri = db_uri or os.environ.get("DB_URI")
+
+        # pre_ping drops connections the server closed, recycle replaces them before server-side idle timeouts
+        engine_args = {"pool_pre_ping": pool_pre_ping, "pool_recycle": pool_recycle}
+        if not db_uri.startswith("sqlite"):
+            # SQLite connections are local files, the size settings only apply to server databases
+            engine_args.update(pool_size=pool_size, max_overflow=max_overflow)
+
+        # result_cache=None gives this agent its own cache, pass one to share it between agents or False to turn it off
+        if result_cache is None:
+            result_cache = QueryResultCache()
+
+        # results over the exporter's row threshold go to a file and the agent gets a preview. Queries the
+        # agent sends to sql_db_export get export_max_rows as their LIMIT, every other query keeps max_rows
+        if result_exporter is None:
+            result_exporter = ResultExporter()
+
+        # table names and table info are introspected once and served from memory until the schema changes
+        self.db = AgentSQLDatabase.from_uri(
+            db_uri,
+            engine_args=engine_args,
+            schema_ttl_seconds=schema_ttl_seconds,
+            read_only=read_only,
+            result_cache=result_cache or None,
+            result_exporter=result_exporter or None,
+            # EXPLAIN before running: too expensive queries go back to the agent with the reason,
+            # queries without LIMIT get max_rows, and every statement stops after statement_timeout_ms
+            cost_guard=CostGuard(
+                max_cost=max_query_cost, max_rows=max_rows, statement_timeout_ms=statement_timeout_ms,
+                export_max_rows=export_max_rows
+            )
+        )
 
-        llm = ChatCohere(
+        self.llm = llm or ChatCohere(
             cohere_api_key=os.environ.get("CO_API_KEY"), 
             model="command-a-03-2025",
+            cache=cache,
             temperature=0
         )
 
-        self.agent = create_sql_agent(
-            llm=llm, 
-            db=db, 
+        # question -> SQL pairs of earlier answers: close matches go into the input as examples, the same question
+        # runs its SQL directly. None uses the index at QUERY_EXAMPLES_PATH, False turns it off. The examples
+        # are kept per database, so an index file can be shared by agents on different databases
+        self.query_examples = default_index() if query_examples is None else (query_examples or None)
+        self.examples_namespace = database_namespace(self.db._engine.url)
+        self.few_shot_examples = few_shot_examples
+        self.min_example_score = min_example_score
+        self.direct_answer_score = direct_answer_score
+
+        self.schema_in_prompt = schema_in_prompt
+        self.max_schema_chars = max_schema_chars
+        self.agent = self._build_executor()
+
+    def _build_executor(self):
+        prefix = SQL_PREFIX
+        if self.schema_in_prompt:
+            # the catalog goes into the prompt, so questions about tables and columns need no tool round trip.
+            # The prefix is formatted twice (by create_sql_agent and by the prompt template), so braces are escaped twice
+            schema = self.db.catalog.prompt_text(self.max_schema_chars).replace("{", "{{{{").replace("}", "}}}}")
+            prefix = (
+                f"{SQL_PREFIX}\n\nThis is the current database schema. Answer questions about the tables and columns "
+                f"directly from it, and only use sql_db_list_tables or sql_db_schema for what it does not show:\n{schema}"
+            )
+        self._schema_version = self.db.catalog.version
+
+        return create_sql_agent(
+            llm=self.llm, 
+            db=self.db, 
+            prefix=prefix,
             verbose=True, 
             handle_parsing_errors=True, 
-            agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION
+            agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+            extra_tools=[ExportSQLDatabaseTool(db=self.db)] if self.db.result_exporter is not None else [],
+            agent_executor_kwargs={"return_intermediate_steps": True}
         )
 
+    def _answer_from_example(self, query: str, example: QueryExample):
+        # one LLM call to phrase the answer instead of the whole list tables -> schema -> query loop
+        result = self.db.run_no_throw(example.sql)
+        if isinstance(result, str) and result.startswith("Error"):
+            # the schema changed since the SQL was recorded, the agent writes a new one
+            return None
+        answer = self.llm.invoke(DIRECT_ANSWER_PROMPT.format(question=query, sql=example.sql, result=result))
+        self.query_examples.record_use(example, direct=True)
+        action = AgentAction(tool="sql_db_query", tool_input=example.sql, log=f"Reused the SQL of: {example.question}")
+        return {"input": query, "output": answer.content, "intermediate_steps": [(action, result)]}
+
+    def _record_example(self, query: str, response: dict):
+        if "Agent stopped" in str(response.get("output", "")):
+            return
+        # the last query that ran without an error is the one the final answer is based on
+        for action, observation in reversed(response.get("intermediate_steps", [])):
+            if action.tool != "sql_db_query" or not isinstance(observation, str) or observation.startswith("Error"):
+                continue
+            sql = action.tool_input.get("query", "") if isinstance(action.tool_input, dict) else action.tool_input
+            rows = columns = None
+            try:
+                parsed = ast.literal_eval(observation) if observation else []
+                rows, columns = len(parsed), len(parsed[0]) if parsed else 0
+            except (ValueError, SyntaxError, TypeError):
+                pass
+            self.query_examples.add(query, sql.strip(), rows, columns, namespace=self.examples_namespace)
+            return
+
     def invoke(self, query: str) -> str:
-        response = self.agent.invoke(query)
+        # a changed schema also changes the prompt
+        self.db.refresh_schema_if_stale()
+        if self.schema_in_prompt and self.db.catalog.version != self._schema_version:
+            self.agent = self._build_executor()
+
+        matches = []
+        if self.query_examples:
+            matches = self.query_examples.search(query, k=self.few_shot_examples, namespace=self.examples_namespace)
+        # a high score alone does not mean the same SQL fits: "active" and "inactive" score almost 1.0,
+        # so only the same words and literals run the recorded SQL, everything else is only an example
+        if matches and matches[0][0] >= self.direct_answer_score and matches[0][1].answers(query):
+            response = self._answer_from_example(query, matches[0][1])
+            if response is not None:
+                print(f"llm response: {response}")
+                return response
+
+        agent_input = query
+        examples = [example for score, example in matches if score >= self.min_example_score]
+        if examples:
+            for example in examples:
+                self.query_examples.record_use(example, direct=False)
+            agent_input = (
+                f"{query}\n\nSimilar questions were answered before with these queries, "
+                "reuse them when they fit instead of exploring the tables again:\n\n"
+                + "\n\n".join(example.prompt_text() for example in examples)
+            )
+
+        response = self.agent.invoke({"input": agent_input})
+        response["input"] = query
+        if self.query_examples:
+            self._record_example(query, response)
         print(f"llm response: {response}")
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,173 @@
+import json
+import math
+import re
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+
+from result_cache import COMMENTS, QUOTED, WORDS, sql_words
+
+LIMIT_STATEMENTS = {"select", "with", "values", "table"}
+AGGREGATE_WORDS = {"group", "count", "sum", "avg", "min", "max", "distinct", "having", "union", "intersect", "except"}
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?([\w$]+)")
+# an alias is the name after a table that is not the next clause
+ALIAS = r"""(?:\s+(?:as\s+)?(?!(?:from|join|on|using|where|group|order|limit|having|window|union|intersect|except|left|right|inner|outer|cross|full|natural)\b)([\w$]+))?"""
+FROM_ALIAS = re.compile(r"""\b(?:from|join)\s+"?([\w$]+)"?""" + ALIAS, re.IGNORECASE)
+# FROM a x, b y: also matches select lists, so these only fill names FROM_ALIAS did not resolve
+COMMA_ALIAS = re.compile(r""",\s*"?([\w$]+)"?""" + ALIAS, re.IGNORECASE)
+
+
+def _code_only(sql: str) -> str:
+    # comments removed and quoted text emptied, what is left is keywords, names and numbers
+    return QUOTED.sub("''", COMMENTS.sub(" ", sql))
+
+
+def has_top_level_limit(sql: str) -> bool:
+    depth = 0
+    for token in re.findall(r"\(|\)|[A-Za-z_]+", _code_only(sql)):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0 and token.lower() in ("limit", "fetch"):
+            return True
+    return False
+
+
+def add_limit(sql: str, max_rows: int) -> str:
+    """Append LIMIT max_rows to a row-returning statement that has no top-level LIMIT."""
+    words = WORDS.findall(_code_only(sql))
+    if not words or words[0].lower() not in LIMIT_STATEMENTS or has_top_level_limit(sql):
+        return sql
+    return f"{sql.rstrip().rstrip(';').rstrip()}\nLIMIT {max_rows}"
+
+
+class QueryTooExpensive(Exception):
+    def __init__(self, cost: float, max_cost: float, detail: str):
+        super().__init__(
+            f"Query rejected before running: its estimated cost {cost:,.0f} is over the limit of {max_cost:,.0f} ({detail}). "
+            "Rewrite it to read less data, for example with selective WHERE conditions on indexed columns, "
+            "fewer joins, or aggregation in SQL instead of returning raw rows."
+        )
+        self.cost = cost
+        self.detail = detail
+
+
+class CostGuard:
+    """
+    Checks a statement with EXPLAIN before it runs, adds a LIMIT to row-returning statements and
+    puts a timeout on every statement.
+
+    The cost is the planner estimate of the dialect: Total Cost of EXPLAIN (FORMAT JSON) on
+    Postgres, and on SQLite the rows examined by the full scans of EXPLAIN QUERY PLAN (scans nested
+    in a join multiply). Statements over max_cost raise QueryTooExpensive with the reason.
+
+    The LIMIT is max_rows, or export_max_rows for statements whose rows are written to a file.
+    """
+
+    def __init__(self, max_cost: float = 1e7, max_rows: Optional[int] = 1000, statement_timeout_ms: Optional[int] = 30000,
+                 export_max_rows: Optional[int] = None):
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.export_max_rows = export_max_rows # None gives exported statements max_rows too
+        self.statement_timeout_ms = statement_timeout_ms
+
+    def install(self, engine: Engine):
+        """Apply statement_timeout_ms to every statement run on the engine."""
+        if not self.statement_timeout_ms:
+            return
+
+        if engine.dialect.name == "postgresql":
+            @event.listens_for(engine, "begin")
+            def set_timeout(conn):
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}")
+
+        elif engine.dialect.name == "sqlite":
+            # SQLite has no statement timeout, a progress handler interrupts the statement past its deadline
+            timeout = self.statement_timeout_ms / 1000
+
+            @event.listens_for(engine, "connect")
+            def add_progress_handler(dbapi_connection, connection_record):
+                info = connection_record.info
+                dbapi_connection.set_progress_handler(
+                    lambda: int(time.monotonic() > info.get("statement_deadline", math.inf)), 10000
+                )
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def set_deadline(conn, cursor, statement, parameters, context, executemany):
+                conn.connection.info["statement_deadline"] = time.monotonic() + timeout
+
+    def _postgres_cost(self, conn: Connection, sql: str) -> Tuple[float, str]:
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        root = plan[0]["Plan"]
+        return float(root["Total Cost"]), f"planner total cost, about {root.get('Plan Rows', 0):,} rows"
+
+    def _sqlite_table_rows(self, conn: Connection, table: str) -> Optional[int]:
+        # max(rowid) is one b-tree lookup, close to the row count unless many rows were deleted.
+        # count(*) covers WITHOUT ROWID tables and views, None when the name is not a table at all
+        for query in (f'SELECT max(rowid) FROM "{table}"', f'SELECT count(*) FROM "{table}"'):
+            try:
+                return int(conn.execute(text(query)).scalar() or 0)
+            except Exception:
+                continue
+        return None
+
+    def _sqlite_cost(self, conn: Connection, sql: str) -> Tuple[float, str]:
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()]
+        code, aliases = _code_only(sql), {}
+        for table, alias in FROM_ALIAS.findall(code):
+            aliases[table.lower()] = table
+            if alias:
+                aliases[alias.lower()] = table
+        for table, alias in COMMA_ALIAS.findall(code):
+            aliases.setdefault(table.lower(), table)
+            if alias:
+                aliases.setdefault(alias.lower(), table)
+
+        cost, scans = 1.0, []
+        for detail in plan:
+            match = SQLITE_SCAN.match(detail)
+            if not match or detail.startswith("SCAN CONSTANT ROW"):
+                continue
+            table = aliases.get(match.group(1).lower())
+            if table is None:
+                # subqueries and CTEs, their own tables have their own SCAN lines
+                continue
+            rows = self._sqlite_table_rows(conn, table)
+            if rows is None:
+                continue
+            scans.append(f"{table} ({rows:,} rows)")
+            cost *= max(rows, 1)
+
+        # a plain scan stops at the LIMIT, sorts and aggregates read everything first
+        limit = re.search(r"\blimit\s+(\d+)\s*$", code.strip().rstrip(";"), re.IGNORECASE)
+        if limit and len(scans) == 1 and not any("TEMP B-TREE" in d for d in plan) and not (sql_words(sql) & AGGREGATE_WORDS):
+            cost = min(cost, float(limit.group(1)))
+
+        return cost, f"full scans of {', '.join(scans)}" if scans else "no full table scans"
+
+    def check(self, conn: Connection, sql: str, export: bool = False) -> str:
+        """Return the statement to run (with the LIMIT added), or raise QueryTooExpensive."""
+        max_rows = (self.export_max_rows or self.max_rows) if export else self.max_rows
+        if max_rows:
+            sql = add_limit(sql, max_rows)
+
+        words = WORDS.findall(_code_only(sql))
+        if self.max_cost is None or not words or words[0].lower() == "explain":
+            return sql
+
+        dialect = conn.engine.dialect.name
+        if dialect == "postgresql":
+            cost, detail = self._postgres_cost(conn, sql)
+        elif dialect == "sqlite":
+            cost, detail = self._sqlite_cost(conn, sql)
+        else:
+            return sql
+
+        if cost > self.max_cost:
+            raise QueryTooExpensive(cost, self.max_cost, detail)
+        return sql
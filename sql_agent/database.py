@@ -0,0 +1,271 @@
+import itertools
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, Union
+
+from langchain_community.tools.sql_database.tool import BaseSQLDatabaseTool
+from langchain_community.utilities.sql_database import SQLDatabase, truncate_word
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import Result
+
+from cost_guard import CostGuard, QueryTooExpensive
+from result_cache import QueryResultCache, is_read_only, normalize_sql, sql_words
+from result_export import ResultExporter
+from schema_catalog import SchemaCatalog, TableEntry, schema_fingerprint
+
+
+class QueryRejected(Exception):
+    """Raised when a statement is not run, the message goes back to the agent as the tool result."""
+
+
+class AgentSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase for the SQL agent that serves the table list and table info from a SchemaCatalog
+    instead of introspecting the database on every sql_db_list_tables / sql_db_schema call.
+
+    With read_only, statements that could write are rejected. Read-only statements are checked
+    by cost_guard when one is given, and their results go through result_cache when one is given.
+    With result_exporter, results over its row threshold are streamed to a file and the agent
+    gets a preview of them, and export_no_throw writes every row of a statement to a file.
+    """
+
+    def __init__(self, engine, schema_ttl_seconds: Optional[float] = 300.0, fingerprint_interval: float = 5.0,
+                 read_only: bool = True, result_cache: QueryResultCache = None, cost_guard: CostGuard = None,
+                 result_exporter: ResultExporter = None, **kwargs):
+        self.read_only = read_only
+        self.result_cache = result_cache
+        self.result_exporter = result_exporter
+        self.cost_guard = cost_guard
+        if cost_guard is not None:
+            # before the first connection is opened, so every connection gets the statement timeout
+            cost_guard.install(engine)
+        self.catalog = SchemaCatalog(ttl_seconds=schema_ttl_seconds, fingerprint_interval=fingerprint_interval)
+        # reentrant: loading the catalog goes through the SQLDatabase methods overridden below
+        self._catalog_lock = threading.RLock()
+        self._loading = True
+
+        super().__init__(engine, **kwargs)
+        with self._catalog_lock:
+            self._load_catalog()
+
+    def _reflect(self):
+        # the same steps as SQLDatabase.__init__, with a fresh inspector so no cached names survive
+        self._inspector = inspect(self._engine)
+        self._all_tables = set(
+            self._inspector.get_table_names(schema=self._schema)
+            + (self._inspector.get_view_names(schema=self._schema) if self._view_support else [])
+        )
+        self._usable_tables = self._include_tables if self._include_tables else self._all_tables - self._ignore_tables
+        self._metadata = MetaData()
+        if not self.lazy_table_reflection:
+            self._metadata.reflect(
+                views=self._view_support,
+                bind=self._engine,
+                only=list(self._usable_tables),
+                schema=self._schema
+            )
+
+    def _load_catalog(self):
+        fingerprint = schema_fingerprint(self._engine, self._schema)
+        tables = {}
+        for name in super().get_usable_table_names():
+            tables[name] = TableEntry(
+                name=name,
+                columns=[
+                    {"name": c["name"], "type": str(c["type"]), "nullable": c.get("nullable", True)}
+                    for c in self._inspector.get_columns(name, schema=self._schema)
+                ],
+                primary_key=self._inspector.get_pk_constraint(name, schema=self._schema).get("constrained_columns") or [],
+                foreign_keys=[
+                    {"columns": fk["constrained_columns"], "referred_table": fk["referred_table"], "referred_columns": fk["referred_columns"]}
+                    for fk in self._inspector.get_foreign_keys(name, schema=self._schema)
+                ],
+                info=super().get_table_info([name])
+            )
+        self.catalog.load(tables, fingerprint)
+        self._loading = False
+
+    def refresh_schema_if_stale(self) -> bool:
+        """Reload the catalog when its TTL ran out or the schema fingerprint changed. True when it was reloaded."""
+        with self._catalog_lock:
+            if not self.catalog.is_stale(lambda: schema_fingerprint(self._engine, self._schema)):
+                return False
+            self._loading = True
+            try:
+                self._reflect()
+                self._load_catalog()
+            finally:
+                self._loading = False
+            return True
+
+    def get_usable_table_names(self) -> Iterable[str]:
+        with self._catalog_lock:
+            if self._loading:
+                # the catalog itself is being built from the database
+                return super().get_usable_table_names()
+            self.refresh_schema_if_stale()
+            return sorted(self.catalog.tables)
+
+    def get_table_info(self, table_names: Optional[List[str]] = None) -> str:
+        with self._catalog_lock:
+            if self._loading:
+                return super().get_table_info(table_names)
+            self.refresh_schema_if_stale()
+            tables = self.catalog.tables
+
+        if table_names is not None:
+            missing = set(table_names).difference(tables)
+            if missing:
+                raise ValueError(f"table_names {missing} not found in database")
+        return "\n\n".join(tables[name].info for name in (table_names or sorted(tables)))
+
+    def _tables_in(self, command: str) -> set:
+        return sql_words(command) & {name.lower() for name in self.catalog.tables}
+
+    def _guard(self, command: str, parameters, export: bool = False) -> str:
+        # EXPLAIN of a statement with bind parameters needs their values, those come from code and are not checked
+        if self.cost_guard is None or parameters:
+            return command
+        with self._engine.connect() as conn:
+            try:
+                return self.cost_guard.check(conn, command, export=export)
+            except QueryTooExpensive as e:
+                raise QueryRejected(str(e)) from e
+
+    def _streams_results(self) -> bool:
+        # SQLDatabase.run sets the search path of other dialects in ways the streamed run does not repeat
+        return self.result_exporter is not None and (self._schema is None or self.dialect == "postgresql")
+
+    def _run_streamed(self, command: str, include_columns: bool, parameters, execution_options, export: bool = False) -> str:
+        # one execution: the first row_threshold + 1 rows decide between the usual result and an export,
+        # with export every row goes to the file
+        exporter = self.result_exporter
+        row_threshold = 0 if export else exporter.row_threshold
+        with self._engine.begin() as connection:
+            if self._schema is not None:
+                connection.exec_driver_sql("SET search_path TO %s", (self._schema,))
+            # a server-side cursor on Postgres, SQLite steps through the rows as they are fetched anyway
+            result = connection.execution_options(stream_results=True, max_row_buffer=exporter.chunk_rows).execute(
+                text(command), parameters or {}, execution_options=execution_options or {}
+            )
+            if not result.returns_rows:
+                return ""
+
+            head = result.fetchmany(row_threshold + 1)
+            if len(head) <= row_threshold:
+                # formatted as SQLDatabase.run formats it
+                res = [{c: truncate_word(v, length=self._max_string_length) for c, v in row._asdict().items()} for row in head]
+                if not include_columns:
+                    res = [tuple(row.values()) for row in res]
+                return str(res) if res else ""
+
+            chunks = itertools.chain([head], iter(lambda: result.fetchmany(exporter.chunk_rows), []))
+            try:
+                return exporter.export(command, list(result.keys()), chunks, max_string_length=self._max_string_length)
+            except SQLAlchemyError:
+                # the statement failed while streaming, run_no_throw reports it like any other database error
+                raise
+            except Exception as e:
+                # a failed export (disk full, a value no writer takes) must not end the agent run,
+                # export() already removed the partial file
+                return f"Error: the result could not be exported: {e}"
+
+    def _timed_run(self, command, fetch, include_columns, parameters, execution_options, bypassed=False, export=False):
+        start = time.perf_counter()
+        if fetch == "all" and self._streams_results():
+            result = self._run_streamed(command, include_columns, parameters, execution_options, export=export)
+        else:
+            result = super().run(command, fetch, include_columns, parameters=parameters, execution_options=execution_options)
+        if self.result_cache is not None:
+            self.result_cache.record_query((time.perf_counter() - start) * 1000, bypassed=bypassed)
+        return result
+
+    def run(
+        self,
+        command: str,
+        fetch: str = "all",
+        include_columns: bool = False,
+        *,
+        parameters: Optional[Dict[str, Any]] = None,
+        execution_options: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Sequence[Dict[str, Any]], Result]:
+        if not isinstance(command, str):
+            # SQLAlchemy statements built in code, not written by the agent
+            return super().run(command, fetch, include_columns, parameters=parameters, execution_options=execution_options)
+
+        if not is_read_only(command):
+            if self.read_only:
+                raise QueryRejected("Only read-only SELECT statements are allowed, this statement was not run.")
+            # writes skip the cache and drop the cached results of the tables they touch
+            result = self._timed_run(command, fetch, include_columns, parameters, execution_options, bypassed=True)
+            if self.result_cache is not None:
+                self.result_cache.invalidate_tables(self._tables_in(command))
+            return result
+
+        if self.result_cache is None or parameters or fetch == "cursor":
+            return self._timed_run(self._guard(command, parameters), fetch, include_columns, parameters, execution_options, bypassed=self.result_cache is not None)
+
+        key = (normalize_sql(command), fetch, include_columns)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # the key is the statement as written, a hit was already checked when it was cached
+        result = self._timed_run(self._guard(command, parameters), fetch, include_columns, parameters, execution_options)
+        if isinstance(result, str) and not result.startswith("Error"):
+            self.result_cache.put(key, result, self._tables_in(command))
+        return result
+
+    def run_no_throw(
+        self,
+        command: str,
+        fetch: str = "all",
+        include_columns: bool = False,
+        *,
+        parameters: Optional[Dict[str, Any]] = None,
+        execution_options: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Sequence[Dict[str, Any]], Result]:
+        # SQLDatabase.run_no_throw only turns SQLAlchemy errors into a message, rejections are reported the same way
+        try:
+            return super().run_no_throw(command, fetch, include_columns, parameters=parameters, execution_options=execution_options)
+        except QueryRejected as e:
+            return f"Error: {e}"
+
+    def export_no_throw(self, command: str) -> str:
+        """
+        Run a read-only statement and write all its rows to a file, the result is the exporter's
+        preview. The LIMIT added to it is the cost guard's export_max_rows, not max_rows.
+        """
+        if not self._streams_results():
+            return "Error: exporting results is not available for this database, use sql_db_query instead."
+        if not is_read_only(command):
+            return "Error: Only read-only SELECT statements can be exported, this statement was not run."
+        # exports skip the result cache, every call writes a new file
+        try:
+            return self._timed_run(self._guard(command, None, export=True), "all", False, None, None, bypassed=True, export=True)
+        except QueryRejected as e:
+            return f"Error: {e}"
+        except SQLAlchemyError as e:
+            return f"Error: {e}"
+
+
+class _ExportSQLDatabaseToolInput(BaseModel):
+    query: str = Field(..., description="A detailed and correct SQL query.")
+
+
+class ExportSQLDatabaseTool(BaseSQLDatabaseTool, BaseTool):
+    """Tool that writes every row of a query to a file, for results too large for sql_db_query."""
+
+    name: str = "sql_db_export"
+    description: str = """
+    Execute a SQL query and save all its rows to a file, you get the file path, the row count and a preview back.
+    Only use it when the user asks for the full data, a file or an export, sql_db_query results are capped.
+    If an error is returned, rewrite the query, check the query, and try again.
+    """
+    args_schema: Type[BaseModel] = _ExportSQLDatabaseToolInput
+
+    def _run(self, query: str, run_manager=None) -> str:
+        return self.db.export_no_throw(query)
@@ -3,4 +3,10 @@ from agent import Agent
 agent = Agent()
 agent.invoke("How many tables are there?")
 
-agent.invoke("How many processes have been registered so far?")
\ No newline at end of file
+agent.invoke("How many processes have been registered so far?")
+# the agent often runs the same COUNT(*) again, those come from the result cache
+print(f"result cache: {agent.db.result_cache.stats()}")
+
+# answered before, runs the recorded SQL instead of the whole agent loop
+agent.invoke("How many processes have been registered so far?")
+print(f"query examples: {agent.query_examples.stats()}")
@@ -0,0 +1,193 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_examples.sqlite3")
+# numbers (2024, 3.5, 1,000) and quoted text, the parts of a question n-grams barely notice when they change
+LITERALS = re.compile(r"""\d+(?:[.,]\d+)*|(?<!\w)'[^']*'|"[^"]*\"""")
+
+
+def normalize_question(question: str) -> str:
+    """Lower case, punctuation and repeated whitespace removed."""
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+def question_literals(question: str) -> List[str]:
+    # case is kept, 'Active' and 'active' are different values in most databases
+    return LITERALS.findall(question)
+
+
+def char_ngrams(text: str, n: int = 3) -> Counter:
+    text = f" {normalize_question(text)} "
+    return Counter(text[i:i + n] for i in range(max(len(text) - n + 1, 1)))
+
+
+def database_namespace(url) -> str:
+    """Namespace of the examples recorded against one database, the URL without its password hashed."""
+    rendered = url.render_as_string(hide_password=True) if hasattr(url, "render_as_string") else str(url)
+    return hashlib.sha256(rendered.encode("utf-8")).hexdigest()[:16]
+
+
+class QueryExample:
+    """A question the agent answered, the SQL that answered it and the shape of its result."""
+
+    def __init__(self, question: str, sql: str, rows: Optional[int], columns: Optional[int], hits: int = 0, namespace: str = ""):
+        self.question = question
+        self.sql = sql
+        self.rows = rows
+        self.columns = columns
+        self.hits = hits
+        self.namespace = namespace
+
+    def prompt_text(self) -> str:
+        shape = f" -- {self.rows} row(s) x {self.columns} column(s)" if self.rows is not None else ""
+        return f"Question: {self.question}\nSQL: {self.sql}{shape}"
+
+    def answers(self, question: str) -> bool:
+        """
+        True when the SQL of this example answers question as it is: the same words, at most in
+        another order, and the same numbers and quoted literals. A close n-gram score alone is not
+        enough, "active" and "inactive", "shipped" and "not shipped" or "in 2024" and "in 2023"
+        score above 0.95 and need different SQL.
+        """
+        if Counter(normalize_question(question).split()) != Counter(normalize_question(self.question).split()):
+            return False
+        return question_literals(question) == question_literals(self.question)
+
+
+class QueryExampleIndex:
+    """
+    On-disk index of question -> SQL pairs, searched by character n-grams without embeddings.
+
+    Pairs are kept in SQLite keyed by (namespace, normalized question), so answering the same question
+    again replaces its SQL. The namespace keeps the examples of different databases apart (see
+    database_namespace), SQL recorded against one database is never offered for another. The index
+    is loaded into memory once and every add() updates both the file and the in-memory postings,
+    nothing is rebuilt. search() ranks by cosine similarity of TF-IDF weighted character n-grams,
+    which tolerates typos, plurals and reordered words.
+    """
+
+    def __init__(self, path: str, n: int = 3):
+        self.path = path
+        self.n = n
+
+        self.examples: Dict[Tuple[str, str], QueryExample] = {} # (namespace, normalized question) -> example
+        self._grams: Dict[Tuple[str, str], Counter] = {}
+        self._postings: Dict[str, set] = {} # n-gram -> keys of the examples containing it
+        self._norms: Dict[Tuple[str, str], float] = {}
+        self._norms_size = -1 # number of examples the cached norms were computed for
+        self._stats = {"searches": 0, "direct": 0, "few_shot": 0, "added": 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_examples (
+                namespace TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                question TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                rows INTEGER,
+                columns INTEGER,
+                hits INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, normalized)
+            )
+            """
+        )
+        self._conn.commit()
+
+        for namespace, normalized, question, sql, rows, columns, hits in self._conn.execute(
+            "SELECT namespace, normalized, question, sql, rows, columns, hits FROM query_examples"
+        ):
+            self._index((namespace, normalized), QueryExample(question, sql, rows, columns, hits, namespace))
+
+    def _index(self, key: Tuple[str, str], example: QueryExample):
+        # caller holds the lock (or is __init__)
+        self.examples[key] = example
+        if key in self._grams:
+            return
+        grams = char_ngrams(key[1], self.n)
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self.examples)) / (1 + len(self._postings.get(gram, ())))) + 1
+
+    def _norm(self, key: Tuple[str, str]) -> float:
+        # document frequencies change with every new example, norms are recomputed lazily after that
+        if self._norms_size != len(self.examples):
+            self._norms = {
+                k: math.sqrt(sum((count * self._idf(gram)) ** 2 for gram, count in grams.items()))
+                for k, grams in self._grams.items()
+            }
+            self._norms_size = len(self.examples)
+        return self._norms[key]
+
+    def add(self, question: str, sql: str, rows: Optional[int] = None, columns: Optional[int] = None, namespace: str = ""):
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        key = (namespace, normalized)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO query_examples (namespace, normalized, question, sql, rows, columns, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, normalized) DO UPDATE SET question = excluded.question, sql = excluded.sql,
+                    rows = excluded.rows, columns = excluded.columns, updated_at = excluded.updated_at
+                """,
+                (namespace, normalized, question, sql, rows, columns, time.time())
+            )
+            self._conn.commit()
+            hits = self.examples[key].hits if key in self.examples else 0
+            self._index(key, QueryExample(question, sql, rows, columns, hits, namespace))
+            self._stats["added"] += 1
+
+    def search(self, question: str, k: int = 3, min_score: float = 0.0, namespace: str = "") -> List[Tuple[float, QueryExample]]:
+        """Up to k (score, example) pairs of namespace, best first. A score of 1.0 is the same normalized question."""
+        grams = char_ngrams(question, self.n)
+        with self._lock:
+            self._stats["searches"] += 1
+            candidates = set().union(*(self._postings.get(gram, ()) for gram in grams)) if grams else set()
+            candidates = {key for key in candidates if key[0] == namespace}
+            if not candidates:
+                return []
+
+            query = {gram: count * self._idf(gram) for gram, count in grams.items()}
+            query_norm = math.sqrt(sum(w * w for w in query.values()))
+            scored = []
+            for key in candidates:
+                doc = self._grams[key]
+                dot = sum(w * doc[gram] * self._idf(gram) for gram, w in query.items() if gram in doc)
+                score = dot / (query_norm * self._norm(key))
+                if score >= min_score:
+                    scored.append((round(score, 4), self.examples[key]))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:k]
+
+    def record_use(self, example: QueryExample, direct: bool):
+        """Count a search result that was used, run directly or given to the agent as an example."""
+        with self._lock:
+            self._stats["direct" if direct else "few_shot"] += 1
+            example.hits += 1
+            self._conn.execute(
+                "UPDATE query_examples SET hits = hits + 1 WHERE namespace = ? AND normalized = ?",
+                (example.namespace, normalize_question(example.question))
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"examples": len(self.examples), **self._stats}
+
+
+def default_index() -> QueryExampleIndex:
+    return QueryExampleIndex(os.environ.get("QUERY_EXAMPLES_PATH", DEFAULT_PATH))
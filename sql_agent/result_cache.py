@@ -0,0 +1,137 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+# string literals and quoted identifiers, kept as they are by normalize_sql
+QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+WORDS = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+# statements starting with anything but READ_STATEMENTS are writes already, these catch the rest
+# (WITH ... DELETE, SELECT ... INTO, EXPLAIN ANALYZE UPDATE, a second statement after a semicolon)
+WRITE_KEYWORDS = {"insert", "update", "delete", "merge", "create", "alter", "drop", "truncate", "grant", "revoke", "attach", "detach", "into"}
+READ_STATEMENTS = {"select", "with", "values", "table", "show", "explain"}
+
+
+def normalize_sql(sql: str) -> str:
+    """Queries that differ only in comments, whitespace, keyword/identifier case or a trailing semicolon share a key."""
+    sql = COMMENTS.sub(" ", sql)
+    parts = QUOTED.split(sql)
+    # even parts are outside quotes: unquoted identifiers and keywords are case-insensitive
+    parts = [re.sub(r"\s+", " ", part.lower()) if i % 2 == 0 else part for i, part in enumerate(parts)]
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def sql_words(sql: str) -> Set[str]:
+    """Lower-cased words of the statement outside string literals, quoted identifiers unquoted."""
+    parts = QUOTED.split(COMMENTS.sub(" ", sql))
+    text = " ".join(part if i % 2 == 0 else (part[1:-1] if part.startswith('"') else "") for i, part in enumerate(parts))
+    return {word.lower() for word in WORDS.findall(text)}
+
+
+def is_read_only(sql: str) -> bool:
+    words = WORDS.findall(QUOTED.sub("''", COMMENTS.sub(" ", sql)))
+    if not words or words[0].lower() not in READ_STATEMENTS:
+        return False
+    return not ({w.lower() for w in words} & WRITE_KEYWORDS)
+
+
+class QueryResultCache:
+    """
+    Results of read-only statements keyed by normalized SQL.
+
+    The cache is bounded by the total size of the stored results and evicts the least recently
+    used first. An entry lives for the shortest TTL of the tables it reads (table_ttl_seconds,
+    otherwise ttl_seconds), and invalidate_tables() drops every entry reading a table, for example
+    after a write went through. Query latencies of the database and of the hits are kept for stats().
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: Optional[float] = 60.0, table_ttl_seconds: Dict[str, float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.table_ttl_seconds = {name.lower(): ttl for name, ttl in (table_ttl_seconds or {}).items()}
+
+        self._entries = OrderedDict() # key -> (expires_at, size, tables, result)
+        self._by_table: Dict[str, Set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "db_queries": 0, "db_ms": 0.0, "hit_ms": 0.0}
+
+    def _ttl(self, tables: Iterable[str]) -> Optional[float]:
+        ttls = [self.table_ttl_seconds.get(t, self.ttl_seconds) for t in tables]
+        ttls = [ttl for ttl in ttls if ttl is not None]
+        return min(ttls) if ttls else self.ttl_seconds
+
+    def _drop(self, key):
+        # caller holds the lock
+        _, size, tables, _ = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            self._by_table.get(table, set()).discard(key)
+
+    def get(self, key) -> Optional[str]:
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (entry[0] is None or time.monotonic() < entry[0]):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["hit_ms"] += (time.perf_counter() - start) * 1000
+                return entry[3]
+            if entry:
+                self._drop(key)
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, result: str, tables: Iterable[str]):
+        size = len(result.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        tables = {t.lower() for t in tables}
+        ttl = self._ttl(tables)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (None if ttl is None else time.monotonic() + ttl, size, tables, result)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tables(self, tables: Iterable[str]):
+        with self._lock:
+            for table in {t.lower() for t in tables}:
+                for key in list(self._by_table.pop(table, ())):
+                    if key in self._entries:
+                        self._drop(key)
+
+    def record_query(self, elapsed_ms: float, bypassed: bool = False):
+        with self._lock:
+            self._stats["db_queries"] += 1
+            self._stats["db_ms"] += elapsed_ms
+            if bypassed:
+                self._stats["bypassed"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            lookups = s["hits"] + s["misses"]
+            return {
+                "hits": s["hits"],
+                "misses": s["misses"],
+                "bypassed": s["bypassed"],
+                "hit_rate": round(s["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "db_queries": s["db_queries"],
+                "db_ms_mean": round(s["db_ms"] / s["db_queries"], 3) if s["db_queries"] else 0.0,
+                "hit_ms_mean": round(s["hit_ms"] / s["hits"], 3) if s["hits"] else 0.0,
+            }
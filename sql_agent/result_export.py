@@ -0,0 +1,179 @@
+import csv
+import hashlib
+import itertools
+import os
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from langchain_community.utilities.sql_database import truncate_word
+
+NUMERIC = (int, float, Decimal)
+
+
+class ColumnStats:
+    """Running statistics of one column, updated chunk by chunk so no column is ever held in memory."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.non_null = 0
+        self.min = None
+        self.max = None
+        self._sum = 0.0
+        self._numeric = 0
+
+    def update(self, value: Any):
+        if value is None:
+            return
+        self.non_null += 1
+        if isinstance(value, NUMERIC) and not isinstance(value, bool):
+            self._sum += float(value)
+            self._numeric += 1
+        try:
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+        except TypeError:
+            # SQLite columns can mix types, min and max are left at what compared
+            pass
+
+    def text(self, max_string_length: int) -> str:
+        parts = [f"{self.non_null:,} non-null"]
+        if self.min is not None:
+            parts.append(f"min {truncate_word(self.min, length=max_string_length)}")
+            parts.append(f"max {truncate_word(self.max, length=max_string_length)}")
+        if self._numeric:
+            parts.append(f"mean {self._sum / self._numeric:,.4g}")
+        return f"- {self.name}: {', '.join(parts)}"
+
+
+class ResultExporter:
+    """
+    Writes query results too large for the prompt to a Parquet or CSV file in directory.
+
+    The rows arrive in chunks from a streamed cursor and are written as they come, so memory stays
+    flat however many rows the query returns. The agent gets a preview instead of the rows: the row
+    and column counts, per-column statistics, the first preview_rows rows and the file path.
+    """
+
+    def __init__(self, directory: str = None, row_threshold: int = 200, preview_rows: int = 10,
+                 chunk_rows: int = 10000, file_format: str = "parquet"):
+        if file_format not in ("parquet", "csv"):
+            raise ValueError(f"Unknown export format: {file_format}")
+
+        self.directory = os.path.abspath(directory or os.environ.get("SQL_EXPORT_DIR", "sql_exports"))
+        self.row_threshold = row_threshold # results with more rows than this are exported
+        self.preview_rows = preview_rows
+        self.chunk_rows = chunk_rows
+        self.file_format = file_format
+
+        self._lock = threading.Lock()
+        self._stats = {"exports": 0, "rows": 0, "bytes": 0}
+
+    def _path(self, command: str) -> str:
+        digest = hashlib.sha1(command.encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}-{uuid.uuid4().hex[:6]}.{self.file_format}")
+
+    def _parquet_to_csv(self, parquet_path: str, csv_path: str, columns: List[str]):
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=self.chunk_rows):
+                writer.writerows(zip(*(column.to_pylist() for column in batch.columns)))
+
+    def _write_parquet(self, path: str, columns: List[str], chunks: Iterator[Sequence]) -> Tuple[int, str]:
+        writer, schema, text_columns, rows = None, None, set(), 0
+        # a join can return two columns with the same name, Parquet needs them apart
+        names = [name if columns.index(name) == i else f"{name}_{i}" for i, name in enumerate(columns)]
+        try:
+            for chunk in chunks:
+                data = {name: [row[i] for row in chunk] for i, name in enumerate(names)}
+                try:
+                    if schema is None:
+                        # the schema comes from the first chunk, columns that were all NULL there are kept as text
+                        inferred = pa.Table.from_pydict(data).schema
+                        text_columns = {f.name for f in inferred if pa.types.is_null(f.type)}
+                        schema = pa.schema([pa.field(f.name, pa.string()) if f.name in text_columns else f for f in inferred])
+                    for name in text_columns:
+                        data[name] = [None if value is None else str(value) for value in data[name]]
+                    # a safe cast: from_pydict(data, schema=schema) would silently truncate 1.5 into an int64 column
+                    table = pa.Table.from_pydict(data).cast(schema)
+                except (pa.ArrowException, OverflowError):
+                    # the chunk does not fit one schema ('N/A' after integers in SQLite, floats after integers,
+                    # a wider NUMERIC): the rows written so far move to CSV, which takes anything, and the rest follow
+                    csv_path = f"{os.path.splitext(path)[0]}.csv"
+                    if writer is None:
+                        return self._write_csv(csv_path, columns, itertools.chain([chunk], chunks))
+                    writer.close()
+                    writer = None
+                    self._parquet_to_csv(path, csv_path, columns)
+                    os.remove(path)
+                    return rows + self._write_csv(csv_path, columns, itertools.chain([chunk], chunks), append=True)[0], csv_path
+                if writer is None:
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows, path
+
+    def _write_csv(self, path: str, columns: List[str], chunks: Iterator[Sequence], append: bool = False) -> Tuple[int, str]:
+        rows = 0
+        with open(path, "a" if append else "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not append:
+                writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows(chunk)
+                rows += len(chunk)
+        return rows, path
+
+    def export(self, command: str, columns: List[str], chunks: Iterable[Sequence], max_string_length: int = 300) -> str:
+        """Write every chunk of rows to a new file and return the preview the agent gets instead of the rows."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(command)
+        stats = [ColumnStats(name) for name in columns]
+        preview = []
+
+        def observed(chunks):
+            # statistics and preview are taken as the writer pulls each chunk, whichever format it ends up in
+            for chunk in chunks:
+                if len(preview) < self.preview_rows:
+                    preview.extend(tuple(truncate_word(v, length=max_string_length) for v in row) for row in chunk[:self.preview_rows - len(preview)])
+                for row in chunk:
+                    for column, value in zip(stats, row):
+                        column.update(value)
+                yield chunk
+
+        write = self._write_parquet if self.file_format == "parquet" else self._write_csv
+        try:
+            rows, path = write(path, columns, observed(chunks))
+        except BaseException:
+            # no half-written file is left behind, with the Parquet -> CSV fallback it can be either one
+            for partial in (path, f"{os.path.splitext(path)[0]}.csv"):
+                if os.path.exists(partial):
+                    os.remove(partial)
+            raise
+
+        with self._lock:
+            self._stats["exports"] += 1
+            self._stats["rows"] += rows
+            self._stats["bytes"] += os.path.getsize(path)
+
+        return (
+            f"The result has {rows:,} rows and {len(columns)} columns, too many to show here. "
+            f"All rows were saved to {path}, give the user that file instead of listing rows, "
+            "and use aggregate queries (COUNT, SUM, GROUP BY) to answer questions about them.\n"
+            "Columns:\n" + "\n".join(column.text(max_string_length) for column in stats)
+            + f"\nFirst {len(preview)} rows: {preview}"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "directory": self.directory}
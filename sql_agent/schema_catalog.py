@@ -0,0 +1,86 @@
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+POSTGRES_FINGERPRINT = """
+SELECT md5(coalesce(string_agg(c.relname || ':' || c.relnatts || ':' || coalesce(s.n_live_tup, 0), ',' ORDER BY c.relname), ''))
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE n.nspname = coalesce(%(schema)s, current_schema()) AND c.relkind IN ('r', 'v', 'm', 'p')
+"""
+
+
+def schema_fingerprint(engine: Engine, schema: Optional[str] = None) -> str:
+    """
+    Cheap value that changes when the schema changes, read without scanning any table.
+
+    SQLite bumps PRAGMA schema_version on every DDL statement. Postgres hashes the catalog
+    (table names, column counts) with the estimated live row counts. Other databases fall back
+    to the list of table names.
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            return str(conn.exec_driver_sql("PRAGMA schema_version").scalar())
+        if engine.dialect.name == "postgresql":
+            return conn.exec_driver_sql(POSTGRES_FINGERPRINT, {"schema": schema}).scalar()
+        names = sorted(inspect(conn).get_table_names(schema=schema))
+    return hashlib.sha256(",".join(names).encode("utf-8")).hexdigest()
+
+
+class TableEntry:
+    """Introspected metadata of one table and the text the sql_db_schema tool shows for it."""
+
+    def __init__(self, name: str, columns: List[dict], primary_key: List[str], foreign_keys: List[dict], info: str):
+        self.name = name
+        self.columns = columns # [{"name", "type", "nullable"}]
+        self.primary_key = primary_key
+        self.foreign_keys = foreign_keys # [{"columns", "referred_table", "referred_columns"}]
+        self.info = info # CREATE TABLE statement and sample rows
+
+
+class SchemaCatalog:
+    """
+    In-memory schema catalog, introspected once and reused until it goes stale.
+
+    It goes stale after ttl_seconds, or earlier when the schema fingerprint changes. The
+    fingerprint is checked at most once every fingerprint_interval seconds. version goes up on
+    every reload, so callers that copied the schema (for example into a prompt) know to refresh.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = 300.0, fingerprint_interval: float = 5.0):
+        self.ttl_seconds = ttl_seconds
+        self.fingerprint_interval = fingerprint_interval
+
+        self.tables: Dict[str, TableEntry] = {}
+        self.version = 0
+        self.loaded = False
+        self._fingerprint = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    def load(self, tables: Dict[str, TableEntry], fingerprint: str):
+        self.tables = tables
+        self._fingerprint = fingerprint
+        self._loaded_at = self._checked_at = time.monotonic()
+        self.version += 1
+        self.loaded = True
+
+    def is_stale(self, fingerprint: Callable[[], str]) -> bool:
+        now = time.monotonic()
+        if self.ttl_seconds is not None and now - self._loaded_at > self.ttl_seconds:
+            return True
+        if now - self._checked_at < self.fingerprint_interval:
+            return False
+        self._checked_at = now
+        return fingerprint() != self._fingerprint
+
+    def prompt_text(self, max_chars: int) -> str:
+        """Table list and full table info, or only the table list when the info does not fit in max_chars."""
+        names = sorted(self.tables)
+        table_list = f"Tables ({len(names)}): {', '.join(names)}"
+        full = "\n\n".join([table_list] + [self.tables[name].info for name in names])
+        return full if len(full) <= max_chars else table_list